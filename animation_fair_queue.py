@@ -1,5 +1,9 @@
 from manim import *
-import random
+
+from export import export_checkpoint
+from fair_queue import SPAMMER, FairQueue
+from long_run import LongRunMonitor
+from timeline import Timeline
 
 # CONFIG remains the same as previous version
 CONFIG = {
@@ -34,6 +38,8 @@ CONFIG = {
     },
     'queue': {
         'spammer_size': 8,
+        'rounds': 3,
+        'spammer_rounds': 2,  # The spammer is only served in the first rounds
         'dot_spacing': 0.4,
         # Different probabilities for each peer
         'new_block_probabilities': [0.6, 0.7, 0.8]
@@ -41,6 +47,13 @@ CONFIG = {
     'highlight': {
         'normal_opacity': 0.1,
         'highlight_opacity': 0.3
+    },
+    # For hour-long renders (many rounds): retire off-screen mobjects every
+    # gc_interval play calls and log memory every report_interval play calls.
+    # 0 disables either.
+    'long_run': {
+        'gc_interval': 0,
+        'report_interval': 0
     }
 }
 
@@ -48,7 +61,6 @@ CONFIG = {
 class NanoFairQueueAnimation(Scene):
     def construct(self):
         self.camera.background_color = CONFIG['colors']['background']
-        self.current_highlighted = None
 
         # Setup queues and labels
         peer_queues = VGroup()
@@ -107,141 +119,161 @@ class NanoFairQueueAnimation(Scene):
             font_size=CONFIG['font_sizes']['processor']
         ).move_to(processor)
 
-        # Initial setup animation
-        self.play(
-            *[Create(obj) for obj in [spammer_queue, *peer_queues, processor]],
-            run_time=CONFIG['timing']['initial_setup']
-        )
-        self.play(
-            *[Write(obj)
-              for obj in [spammer_label, *queue_labels, processor_label]],
-            run_time=CONFIG['timing']['initial_setup']
-        )
+        timing = CONFIG['timing']
+        all_queues = [spammer_queue, *peer_queues]
+
+        def queue_mobject(queue_name):
+            return spammer_queue if queue_name == SPAMMER else peer_queues[queue_name]
 
         processed_dots = VGroup()
         next_processed_x = processor.get_right()[0] + 1
 
-        # Create initial spammer messages from right to left
-        spammer_dots = VGroup()
-        for i in range(CONFIG['queue']['spammer_size']):
-            x_pos = spammer_queue.get_left(
-            )[0] + 0.5 + i * CONFIG['queue']['dot_spacing']
-            dot = Dot(color=CONFIG['colors']['gray'], radius=0.08)
-            dot.move_to([x_pos, spammer_queue.get_center()[1], 0])
-            spammer_dots.add(dot)
-
-        self.play(
-            AnimationGroup(
-                *[FadeIn(dot) for dot in spammer_dots],
+        fair_queue = FairQueue(
+            peer_count=len(peer_queues),
+            spammer_size=CONFIG['queue']['spammer_size'],
+            new_block_probabilities=CONFIG['queue']['new_block_probabilities'],
+            spammer_rounds=CONFIG['queue']['spammer_rounds']
+        )
+        # Dot of every queued block id, and of the blocks being processed
+        block_dots = {}
+        processing_dots = {}
+        monitor = LongRunMonitor(
+            self,
+            gc_interval=CONFIG['long_run']['gc_interval'],
+            report_interval=CONFIG['long_run']['report_interval']
+        )
+        monitor.track(processed_dots)
+
+        def create_block_dot(queue_name, block, slot):
+            if queue_name == SPAMMER:
+                # Spammer messages line up from left to right
+                color = CONFIG['colors']['gray']
+                x_pos = spammer_queue.get_left(
+                )[0] + 0.5 + slot * CONFIG['queue']['dot_spacing']
+                y_pos = spammer_queue.get_center()[1]
+            else:
+                # Peer messages line up from right to left
+                color = CONFIG['colors']['peer_colors'][queue_name]
+                x_pos = peer_queues[queue_name].get_right(
+                )[0] - 0.5 - slot * CONFIG['queue']['dot_spacing']
+                y_pos = peer_queues[queue_name].get_center()[1]
+            dot = monitor.dot_pool.acquire(
+                point=[x_pos, y_pos, 0], radius=0.08, color=color)
+            block_dots[block] = dot
+            return dot
+
+        # Event builders. Each one runs right before its play call, so dots
+        # are created and moved in simulation order.
+        def reset_highlight():
+            return [q.animate.set_fill(opacity=CONFIG['highlight']['normal_opacity'])
+                    for q in all_queues]
+
+        def highlight(queue_name):
+            return lambda: queue_mobject(queue_name).animate.set_fill(
+                opacity=CONFIG['highlight']['highlight_opacity'])
+
+        def fade_in_block(queue_name, block, slot):
+            return lambda: FadeIn(create_block_dot(queue_name, block, slot))
+
+        def move_to_processor(block):
+            def build():
+                dot = block_dots.pop(block)
+                processing_dots[block] = dot
+                return dot.animate.move_to(processor.get_center())
+            return build
+
+        def move_to_processed(block):
+            def build():
+                nonlocal next_processed_x
+                dot = processing_dots.pop(block)
+                final_pos = np.array(
+                    [next_processed_x, processor.get_center()[1], 0])
+                next_processed_x += 0.25
+                processed_dots.add(dot)
+                return dot.animate.move_to(final_pos)
+            return build
+
+        # Setup: queues, labels, and the initial blocks of every queue
+        setup = Timeline()
+        setup.add(
+            "create_queues",
+            lambda: [Create(obj) for obj in [*all_queues, processor]],
+            timing['initial_setup']
+        )
+        setup.add(
+            "write_labels",
+            lambda: [Write(obj)
+                     for obj in [spammer_label, *queue_labels, processor_label]],
+            timing['initial_setup']
+        )
+        setup.add(
+            "spammer_blocks",
+            lambda: AnimationGroup(
+                *[FadeIn(create_block_dot(SPAMMER, block, slot))
+                  for slot, block in enumerate(fair_queue.spammer)],
                 lag_ratio=0.05
             ),
-            run_time=0.5
+            0.5
         )
-
-        # Initialize each peer with exactly one transaction
-        # Change to list of lists to support multiple dots per peer
-        peer_dots = [[] for _ in range(3)]
-        for i in range(3):
-            dot = Dot(color=CONFIG['colors']['peer_colors'][i], radius=0.08)
-            dot.move_to(peer_queues[i].get_right() + LEFT * 0.5)
-            peer_dots[i].append(dot)
-            self.play(FadeIn(dot), run_time=CONFIG['timing']['new_block'])
-
-        def process_message(dot, queue, is_priority=False):
-            self.play(
-                dot.animate.move_to(processor.get_center()),
-                run_time=CONFIG['timing']['process_priority'] if is_priority else CONFIG['timing']['process_normal']
-            )
-
-            nonlocal next_processed_x
-            final_pos = np.array(
-                [next_processed_x, processor.get_center()[1], 0])
-            self.play(
-                dot.animate.move_to(final_pos),
-                run_time=CONFIG['timing']['process_priority']
-            )
-
-            next_processed_x += 0.25
-            processed_dots.add(dot)
-
-        def highlight_queue(queue):
-            self.play(
-                *[q.animate.set_fill(opacity=CONFIG['highlight']['normal_opacity'])
-                  for q in [spammer_queue, *peer_queues]],
-                run_time=CONFIG['timing']['highlight_duration'] / 2
-            )
-            self.play(
-                queue.animate.set_fill(
-                    opacity=CONFIG['highlight']['highlight_opacity']),
-                run_time=CONFIG['timing']['highlight_duration'] / 2
-            )
-            self.current_highlighted = queue
-
-        def unhighlight_all():
-            self.play(
-                *[q.animate.set_fill(opacity=CONFIG['highlight']['normal_opacity'])
-                  for q in [spammer_queue, *peer_queues]],
-                run_time=CONFIG['timing']['highlight_duration'] / 2
-            )
-            self.current_highlighted = None
-
-        def add_blocks(peer_dots):
-            # Add new transactions with different probabilities for each peer
-            for i in range(len(peer_dots)):
-                if random.random() < CONFIG['queue']['new_block_probabilities'][i]:
-                    dot = Dot(color=CONFIG['colors']
-                              ['peer_colors'][i], radius=0.08)
-                    x_pos = peer_queues[i].get_right(
-                    )[0] - 0.5 - len(peer_dots[i]) * CONFIG['queue']['dot_spacing']
-                    dot.move_to([x_pos, peer_queues[i].get_center()[1], 0])
-                    peer_dots[i].append(dot)
-                    self.play(
-                        FadeIn(dot), run_time=CONFIG['timing']['new_block'])
-
-        # Processing loop with round-robin highlighting including spammer
-        for round in range(3):  # Number of complete rounds
-            # Process all peers
-            for i in range(3):  # Process peers 1, 2, and 3
-                highlight_queue(peer_queues[i])
-
-                if peer_dots[i]:  # If peer has any dots
-                    dot_to_process = peer_dots[i].pop(0)  # Take the first dot
-                    process_message(
-                        dot_to_process, peer_queues[i], is_priority=True)
-                else:
-                    # Small pause to show we're checking this empty queue
-                    self.wait(CONFIG['timing']['highlight_duration'])
-
-            # Process spammer only in first two rounds
-            if round < 2:
-                highlight_queue(spammer_queue)
-
-                # Add new transactions with different probabilities for each peer
-                add_blocks(peer_dots)
-
-                if len(spammer_dots) > 0:
-                    leftmost_dot = spammer_dots[0]
-                    process_message(leftmost_dot, spammer_queue)
-                    spammer_dots.remove(leftmost_dot)
-
-                    # Add new spammer dot at the right end
-                    new_dot = Dot(color=CONFIG['colors']['gray'], radius=0.08)
-                    x_pos = spammer_queue.get_left(
-                    )[0] + 0.5 + (len(spammer_dots)) * CONFIG['queue']['dot_spacing']
-                    new_dot.move_to([x_pos, spammer_queue.get_center()[1], 0])
-                    spammer_dots.add(new_dot)
-                    self.play(FadeIn(new_dot),
-                              run_time=CONFIG['timing']['new_block'])
-
-                # Only add new transactions after first two complete rounds
-                unhighlight_all()
+        # Each peer starts with exactly one block
+        for i, peer in enumerate(fair_queue.peers):
+            setup.add(f"peer_block_{i}", fade_in_block(i, peer[0], 0),
+                      timing['new_block'])
+        setup.play(self)
+
+        # Round robin, laid out from the simulated events. The simulation
+        # does not depend on the animation, so it runs up front.
+        round_robin = Timeline()
+        half_highlight = timing['highlight_duration'] / 2
+        for n, event in enumerate(
+                fair_queue.run(rounds=CONFIG['queue']['rounds'])):
+            name = f"{n}_{event.kind}_{event.queue}"
+            if event.kind == "highlight":
+                round_robin.add(f"{name}_reset", reset_highlight, half_highlight)
+                round_robin.add(name, highlight(event.queue), half_highlight)
+            elif event.kind == "process":
+                is_priority = event.queue != SPAMMER
+                round_robin.add(
+                    f"{name}_in",
+                    move_to_processor(event.block),
+                    timing['process_priority'] if is_priority else timing['process_normal']
+                )
+                round_robin.add(f"{name}_out", move_to_processed(event.block),
+                                timing['process_priority'])
+            elif event.kind == "skip":
+                # Small pause to show we're checking this empty queue
+                round_robin.hold(name, timing['highlight_duration'])
+            elif event.kind == "new_block":
+                round_robin.add(
+                    name, fade_in_block(event.queue, event.block, event.slot),
+                    timing['new_block'])
+            elif event.kind == "unhighlight":
+                round_robin.add(name, reset_highlight, half_highlight)
+
+        export_checkpoint(self, "round_robin")
+        round_robin.play(self, after_segment=lambda segment: monitor.step())
+        export_checkpoint(self, "round_robin_end")
 
         # Fade out all elements
-        self.wait(0.5)
-        self.play(
-            *[FadeOut(mob, shift=UP * 0.3) for mob in self.mobjects],
-            run_time=0.5
+        outro = Timeline()
+        outro.hold("final_hold", 0.5)
+        outro.add(
+            "fade_out",
+            lambda: [FadeOut(mob, shift=UP * 0.3) for mob in self.mobjects],
+            0.5
         )
+        outro.play(self)
+
+
+# Stills and loops captured while rendering with `cli.py render --export`
+EXPORT_TARGETS = [
+    {'name': "fair_queue_thumbnail", 'kind': "thumbnail", 'at': "round_robin",
+     'width': 1280},
+    {'name': "fair_queue_round_robin", 'kind': "gif",
+     'start': "round_robin", 'end': "round_robin_end", 'fps': 15},
+    {'name': "fair_queue_sprites", 'kind': "sprites",
+     'start': "round_robin", 'end': "round_robin_end", 'fps': 2, 'width': 320},
+]
 
 
 if __name__ == "__main__":
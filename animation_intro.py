@@ -2,6 +2,8 @@ import os
 from manim import *
 import numpy as np
 
+from timeline import Timeline
+
 # =============================================
 # Configuration Settings
 # =============================================
@@ -52,7 +54,10 @@ CONFIG = {
         'feature_cascade': 0.5,
         'final_movement': 0.3,
         'final_hold': 1.3,
-        'fade_out': 0.3
+        'fade_out': 0.3,
+        'logo_flash': 1.0,
+        'feature_overlap': 0.25,  # Seconds each feature overlaps the previous
+        'total_duration': None    # Stretch the whole intro, e.g. to a voiceover
     },
 
     # Animation Settings
@@ -76,8 +81,12 @@ def create_nano_svg():
 <path d="M505.763 674.778H453.296L254.183 364.339L52.033 674.778H0L226.563 323.078L20.1835 0H73.6716L255.034 284.171L440.234 0H490.421L281.821 322.157L505.763 674.778Z" fill="white"/>
 <path d="M49.761 302.515H457.703V340.894H49.761V302.515ZM49.761 417.65H457.72V456.029H49.744L49.761 417.65Z" fill="white"/>
 </svg>"""
-    with open("nano_logo.svg", "w") as f:
+    # Write through a temporary file so that parallel renders never read a
+    # half-written logo
+    tmp_path = f"nano_logo.svg.{os.getpid()}"
+    with open(tmp_path, "w") as f:
         f.write(svg_content)
+    os.replace(tmp_path, "nano_logo.svg")
     return "nano_logo.svg"
 
 
@@ -138,72 +147,93 @@ class NanoIntroAnimation(Scene):
         starting_shifts = VGroup(nano_logo, title_group, features)
         starting_shifts.shift(RIGHT * CONFIG['offset_distance'])
 
-        # Animation sequence
+        # Features are moved into place while invisible, then faded in
+        for feature in features:
+            feature.set_opacity(0)
+        features.shift(LEFT * CONFIG['offset_distance'])
+
+        # Animation sequence, compiled into merged play calls
+        timings = CONFIG['timings']
+        timeline = Timeline()
+
         # 1. Logo entrance
-        self.play(
-            nano_logo.animate.shift(LEFT * CONFIG['offset_distance']),
-            run_time=CONFIG['timings']['logo_entrance'],
-            rate_func=smooth
+        timeline.add(
+            "logo_entrance",
+            lambda: nano_logo.animate.shift(LEFT * CONFIG['offset_distance']),
+            timings['logo_entrance']
         )
 
         # 2. Logo rotation
-        for angle in [CONFIG['logo']['rotation_degrees'], -CONFIG['logo']['rotation_degrees']]:
-            self.play(
-                Rotate(
+        for i, angle in enumerate([CONFIG['logo']['rotation_degrees'], -CONFIG['logo']['rotation_degrees']]):
+            timeline.add(
+                f"logo_rotation_{i}",
+                lambda angle=angle: Rotate(
                     nano_logo,
                     angle=angle * DEGREES,
                     about_point=nano_logo.get_center()
                 ),
-                run_time=CONFIG['timings']['logo_rotation']
+                timings['logo_rotation']
             )
 
         # 3. Title entrance
-        self.play(
-            title_group.animate.shift(LEFT * CONFIG['offset_distance']),
-            run_time=CONFIG['timings']['title_entrance'],
-            rate_func=smooth
+        timeline.add(
+            "title_entrance",
+            lambda: title_group.animate.shift(
+                LEFT * CONFIG['offset_distance']),
+            timings['title_entrance']
         )
 
         # 4. Logo flash effect
-        flash = Flash(
-            nano_logo.get_center(),
-            color=CONFIG['colors']['accent'],
-            line_length=CONFIG['logo']['flash_length'],
-            num_lines=CONFIG['logo']['flash_lines'],
-            flash_radius=CONFIG['logo']['flash_radius'],
-            time_width=CONFIG['logo']['flash_time_width']
+        timeline.add(
+            "logo_flash",
+            lambda: Flash(
+                nano_logo.get_center(),
+                color=CONFIG['colors']['accent'],
+                line_length=CONFIG['logo']['flash_length'],
+                num_lines=CONFIG['logo']['flash_lines'],
+                flash_radius=CONFIG['logo']['flash_radius'],
+                time_width=CONFIG['logo']['flash_time_width']
+            ),
+            timings['logo_flash']
         )
-        self.play(flash)
 
         # 5. Feature cascade
-        for feature in features:
-            feature.set_opacity(0)
-        features.shift(LEFT * CONFIG['offset_distance'])
-
-        for feature in features:
-            self.play(
-                feature.animate.set_opacity(1),
-                run_time=CONFIG['timings']['feature_cascade']
+        for i, feature in enumerate(features):
+            timeline.add(
+                f"feature_{i}",
+                lambda feature=feature: feature.animate.set_opacity(1),
+                timings['feature_cascade'],
+                offset=-timings['feature_overlap'] if i > 0 else 0.0
             )
 
         # 6. Final subtle movement
-        self.play(
-            nano_logo.animate.shift(RIGHT * 0.1),
-            title_group.animate.shift(LEFT * 0.1),
-            run_time=CONFIG['timings']['final_movement']
+        timeline.add(
+            "final_movement",
+            lambda: [
+                nano_logo.animate.shift(RIGHT * 0.1),
+                title_group.animate.shift(LEFT * 0.1)
+            ],
+            timings['final_movement']
         )
 
         # 7. Hold frame
-        self.wait(CONFIG['timings']['final_hold'])
+        timeline.hold("final_hold", timings['final_hold'])
 
         # 8. Fade out
-        self.play(
-            nano_logo.animate.shift(LEFT * 0.5).set_opacity(0),
-            title_group.animate.shift(RIGHT * 0.5).set_opacity(0),
-            features.animate.shift(DOWN * 0.3).set_opacity(0),
-            run_time=CONFIG['timings']['fade_out']
+        timeline.add(
+            "fade_out",
+            lambda: [
+                nano_logo.animate.shift(LEFT * 0.5).set_opacity(0),
+                title_group.animate.shift(RIGHT * 0.5).set_opacity(0),
+                features.animate.shift(DOWN * 0.3).set_opacity(0)
+            ],
+            timings['fade_out']
         )
 
+        if timings['total_duration'] is not None:
+            timeline.fit(timings['total_duration'])
+        timeline.play(self)
+
 
 def cleanup():
     if os.path.exists("nano_logo.svg"):
@@ -0,0 +1,139 @@
+import copy
+import importlib
+import json
+import traceback
+from multiprocessing import Pool
+
+# Scenes that can be re-themed, and the module holding their CONFIG
+SCENE_MODULES = {
+    "NanoIntroAnimation": "animation_intro",
+    "NanoFairQueueAnimation": "animation_fair_queue",
+}
+
+
+def merge_config(base: dict, overrides: dict) -> dict:
+    """
+    Returns a copy of `base` with `overrides` applied recursively.
+
+    Nested dicts are merged key by key; any other value (including lists such
+    as `features` or `peer_colors`) replaces the base value.
+
+    Args:
+        base (dict): Scene CONFIG to start from
+        overrides (dict): Partial CONFIG with the values to change
+    """
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def warm_up():
+    """
+    Imports Manim and the scene modules, and loads the fonts and the logo SVG
+    once per worker so that every variant rendered by it starts warm.
+    """
+    from manim import SVGMobject, Text
+    from animation_intro import create_nano_svg
+
+    for module_name in SCENE_MODULES.values():
+        scene_config = importlib.import_module(module_name).CONFIG
+        for font in set(scene_config['fonts'].values()):
+            Text("NANO", font=font)
+    SVGMobject(create_nano_svg())
+
+
+def render_variant(variant: dict) -> tuple:
+    """
+    Renders a single variant in the current process.
+
+    A failing variant is reported instead of raised, so that one broken
+    variant does not abandon the rest of the batch.
+
+    Args:
+        variant (dict): `scene` (class name), `name` (output file name),
+            optional `config` overrides and optional `seed`
+
+    Returns:
+        tuple: Name of the variant and the formatted traceback of its
+            failure, or None if it rendered
+    """
+    try:
+        _render_variant(variant)
+    except Exception:
+        return variant.get('name'), traceback.format_exc()
+    return variant['name'], None
+
+
+def _render_variant(variant: dict):
+    from manim import tempconfig
+
+    scene_name = variant['scene']
+    module = importlib.import_module(SCENE_MODULES[scene_name])
+    base_config = module.CONFIG
+    # The scenes read the module-level CONFIG, so swap it for this render.
+    # Each worker renders one variant at a time, so this is not shared state.
+    module.CONFIG = merge_config(base_config, variant.get('config', {}))
+    try:
+        with tempconfig({
+            "output_file": variant['name'],
+            # Separate partial movies so variants never overwrite each other
+            "partial_movie_dir": (
+                "{video_dir}/partial_movie_files/{scene_name}/" + variant['name']
+            ),
+        }):
+            scene = getattr(module, scene_name)(random_seed=variant.get('seed'))
+            scene.render()
+    finally:
+        module.CONFIG = base_config
+
+
+def render_variants(variants: list, workers: int = None):
+    """
+    Renders all variants in a pool of long-lived worker processes.
+
+    Args:
+        variants (list): Variant dicts, see `render_variant`
+        workers (int): Number of worker processes (defaults to CPU count)
+
+    Yields:
+        tuple: Name and failure traceback (None on success) of each variant
+            as soon as it has finished
+    """
+    with Pool(processes=workers, initializer=warm_up) as pool:
+        yield from pool.imap_unordered(render_variant, variants)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from animation_intro import cleanup
+
+    parser = argparse.ArgumentParser(
+        description="Render many CONFIG variants of the scenes in one pool.")
+    parser.add_argument(
+        "variants",
+        help="JSON file with a list of {scene, name, config, seed} objects")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.variants) as f:
+        variants = json.load(f)
+
+    failed = []
+    try:
+        for name, error in render_variants(variants, workers=args.workers):
+            if error is None:
+                print(f"Rendered {name}")
+            else:
+                failed.append(name)
+                print(f"Failed {name}\n{error}")
+    finally:
+        cleanup()
+
+    if failed:
+        raise SystemExit(f"{len(failed)} of {len(variants)} variants failed: "
+                         + ", ".join(map(str, failed)))
@@ -0,0 +1,148 @@
+"""
+List and render the project's scenes.
+
+    python cli.py list
+    python cli.py render NanoFairQueueAnimation --quality high_quality
+
+Manim is only imported by `render`, and render settings are applied for the
+duration of that render instead of when a scene module is imported.
+"""
+import argparse
+import importlib
+from contextlib import contextmanager
+
+# Scene name -> module defining it. Modules are imported only when rendering.
+SCENES = {
+    "NanoIntroAnimation": "animation_intro",
+    "NanoFairQueueAnimation": "animation_fair_queue",
+    "MultiQueueScene": "priority_system_parallel",
+}
+
+
+@contextmanager
+def render_settings(settings: dict):
+    """
+    Applies Manim config settings for the duration of the context and
+    restores the previous config afterwards.
+
+    Args:
+        settings (dict): Config keys and values, e.g. quality or frame_rate
+    """
+    from manim import config, tempconfig
+
+    # The quality preset also sets the frame rate, so it is applied first
+    # to let an explicit frame_rate win
+    ordered = sorted(settings.items(), key=lambda item: item[0] != 'quality')
+    with tempconfig({}):
+        for key, value in ordered:
+            config[key] = value
+        yield
+
+
+def render(scene_name: str, settings: dict = None, seed: int = None,
+           incremental: bool = False, pipelined: bool = False,
+           variants: list = None, export: bool = False):
+    """
+    Renders one scene.
+
+    Args:
+        scene_name (str): Name of a scene in `SCENES`
+        settings (dict): Config overrides on top of the module's
+            RENDER_SETTINGS
+        seed (int): Seed for `random` and `numpy.random`
+        incremental (bool): Reuse unchanged play segments of earlier runs
+        pipelined (bool): Encode frames on a background thread
+        variants (list): Extra resolutions written from the same render,
+            e.g. ["720p60", "480p30"]
+        export (bool): Capture the module's EXPORT_TARGETS while rendering
+    """
+    module = importlib.import_module(SCENES[scene_name])
+    scene_class = getattr(module, scene_name)
+    scene_settings = {**getattr(module, 'RENDER_SETTINGS', {}),
+                      **(settings or {})}
+
+    if incremental and (variants or export):
+        raise ValueError("--variant and --export need a full render, "
+                         "not --incremental")
+    if variants or export:
+        # Cached segments are never rasterized, so frame sinks would miss them
+        scene_settings['disable_caching'] = True
+
+    scene_kwargs = {}
+    with render_settings(scene_settings):
+        frame_sinks = []
+        try:
+            if variants:
+                from multi_resolution import MultiResolutionSink
+                frame_sinks.append(MultiResolutionSink(scene_name, variants))
+            if export:
+                from manim import config
+
+                from export import FrameExporter, exports_directory
+                frame_sinks.append(FrameExporter(
+                    getattr(module, 'EXPORT_TARGETS', []),
+                    exports_directory(scene_name), config.frame_rate))
+
+            if pipelined or frame_sinks:
+                from render_pipeline import PipelinedRenderer
+                scene_kwargs['renderer'] = PipelinedRenderer(
+                    frame_sinks=frame_sinks)
+
+            if incremental:
+                from incremental_render import render_incremental
+                return render_incremental(scene_class, seed=seed or 0,
+                                          **scene_kwargs)
+            scene = scene_class(random_seed=seed, **scene_kwargs)
+            scene.render()
+            return scene
+        finally:
+            # The file writer closes the sinks when it finishes; a failed
+            # render never gets there
+            for sink in frame_sinks:
+                sink.close()
+            if hasattr(module, 'cleanup'):
+                module.cleanup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list', help="List the available scenes")
+
+    render_parser = commands.add_parser('render', help="Render scenes")
+    render_parser.add_argument('scenes', nargs='+', choices=sorted(SCENES))
+    render_parser.add_argument('--quality',
+                               help="e.g. low_quality, high_quality")
+    render_parser.add_argument('--fps', type=int, dest='frame_rate')
+    render_parser.add_argument('--output', dest='output_file')
+    render_parser.add_argument('--seed', type=int)
+    render_parser.add_argument('--incremental', action='store_true',
+                               help="Reuse unchanged play segments")
+    render_parser.add_argument('--pipelined', action='store_true',
+                               help="Encode on a background thread")
+    render_parser.add_argument('--variant', action='append', dest='variants',
+                               help="Also write e.g. 720p60 or 480p30 from "
+                                    "the same render (repeatable)")
+    render_parser.add_argument('--export', action='store_true',
+                               help="Write the scene's thumbnails, GIFs and "
+                                    "sprite sheets while rendering")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for scene_name, module_name in SCENES.items():
+            print(f"{scene_name}\t{module_name}.py")
+        return
+
+    settings = {key: getattr(args, key)
+                for key in ('quality', 'frame_rate', 'output_file')
+                if getattr(args, key) is not None}
+    for scene_name in args.scenes:
+        render(scene_name, settings, seed=args.seed,
+               incremental=args.incremental, pipelined=args.pipelined,
+               variants=args.variants, export=args.export)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import json
+import math
+from pathlib import Path
+
+from PIL import Image
+
+# Frames sampled to build the shared GIF palette
+PALETTE_SAMPLES = 16
+
+
+class ExportTarget:
+    """
+    A still, loop or sprite sheet cut from the frames of a render.
+
+    A target spans either two named checkpoints (`start` and `end`) or a
+    frame range (`frames=(first, last)`, last excluded). Thumbnails take a
+    single frame: the one on screen at checkpoint `at`, or the first frame of
+    `frames`.
+
+    Args:
+        name (str): Output file name without extension
+        kind (str): "thumbnail", "gif", "webp" or "sprites"
+        at (str): Checkpoint of a thumbnail
+        start (str): Checkpoint starting the capture
+        end (str): Checkpoint ending the capture (defaults to the end of the
+            render)
+        frames (tuple): Frame range to capture instead of checkpoints
+        fps (int): Frame rate of the loop or sprite sheet
+        width (int): Width of the captured frames in pixels
+        columns (int): Columns of a sprite sheet (defaults to a square grid)
+        colors (int): Palette size of a GIF
+    """
+
+    KINDS = ("thumbnail", "gif", "webp", "sprites")
+
+    def __init__(self, name, kind="gif", at=None, start=None, end=None,
+                 frames=None, fps=15, width=480, columns=None, colors=256):
+        if kind not in self.KINDS:
+            raise ValueError(f"Export target {name}: unknown kind {kind!r}")
+        if at is None and start is None and frames is None:
+            raise ValueError(
+                f"Export target {name}: needs a checkpoint or a frame range")
+        self.name = name
+        self.kind = kind
+        self.at = at
+        self.start = start
+        self.end = end
+        self.frames = frames
+        self.fps = fps
+        self.width = width
+        self.columns = columns
+        self.colors = colors
+
+        self.step = 1
+        self.last_source = None
+        self.started_at = None
+        self.done = False
+        self.images = []
+
+    def wants(self, index):
+        if self.done:
+            return False
+        if self.frames is not None:
+            first, last = self.frames
+            if self.kind == "thumbnail":
+                return index == first
+            return first <= index < last and (index - first) % self.step == 0
+        if self.kind == "thumbnail" or self.started_at is None:
+            return False
+        return (index - self.started_at) % self.step == 0
+
+    def add(self, image):
+        if image is self.last_source:
+            # A held frame (wait or freeze) is resized only once
+            self.images.append(self.images[-1])
+        else:
+            height = round(image.height * self.width / image.width)
+            self.images.append(image.resize((self.width, height), Image.LANCZOS))
+            self.last_source = image
+        if self.kind == "thumbnail":
+            self.done = True
+
+    def save(self, directory):
+        """Writes the captured frames; returns the written paths."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        duration = round(1000 / self.fps)
+
+        if self.kind == "thumbnail":
+            path = directory / f"{self.name}.png"
+            self.images[0].save(path, optimize=True)
+            return [path]
+
+        if self.kind == "gif":
+            path = directory / f"{self.name}.gif"
+            frames = quantize_frames(self.images, self.colors)
+            frames[0].save(path, save_all=True, append_images=frames[1:],
+                           duration=duration, loop=0, optimize=True)
+            return [path]
+
+        if self.kind == "webp":
+            path = directory / f"{self.name}.webp"
+            self.images[0].save(path, save_all=True,
+                                append_images=self.images[1:],
+                                duration=duration, loop=0, quality=80,
+                                method=6)
+            return [path]
+
+        columns = self.columns or math.ceil(math.sqrt(len(self.images)))
+        rows = math.ceil(len(self.images) / columns)
+        width, height = self.images[0].size
+        sheet = Image.new("RGB", (columns * width, rows * height))
+        for i, image in enumerate(self.images):
+            sheet.paste(image, ((i % columns) * width, (i // columns) * height))
+
+        path = directory / f"{self.name}.png"
+        sheet.save(path, optimize=True)
+        index_path = directory / f"{self.name}.json"
+        index_path.write_text(json.dumps({
+            "image": path.name,
+            "frame_width": width,
+            "frame_height": height,
+            "columns": columns,
+            "frames": len(self.images),
+            "fps": self.fps,
+        }, indent=2))
+        return [path, index_path]
+
+
+def quantize_frames(images, colors=256):
+    """
+    Maps every frame onto one palette built from frames sampled across the
+    loop, so colors stay stable between frames and the GIF optimizer can
+    reuse unchanged regions.
+    """
+    step = max(1, len(images) // PALETTE_SAMPLES)
+    samples = images[::step]
+    width, height = samples[0].size
+    montage = Image.new("RGB", (width, height * len(samples)))
+    for i, image in enumerate(samples):
+        montage.paste(image, (0, i * height))
+
+    palette = montage.quantize(colors=colors, method=Image.Quantize.MEDIANCUT)
+    return [image.quantize(palette=palette, dither=Image.Dither.NONE)
+            for image in images]
+
+
+class FrameExporter:
+    """
+    Frame sink for `render_pipeline.PipelinedFileWriter` that captures the
+    frames of its export targets while the scene renders, so stills and
+    loops never need a second decode of the video.
+
+    Scenes mark checkpoints with `export_checkpoint(scene, name)`.
+    """
+
+    def __init__(self, targets, directory, frame_rate):
+        self.targets = [target if isinstance(target, ExportTarget)
+                        else ExportTarget(**target) for target in targets]
+        self.directory = Path(directory)
+        self.frame_index = 0
+        self.closed = False
+        for target in self.targets:
+            target.step = max(1, round(frame_rate / target.fps))
+            target.fps = frame_rate / target.step
+        self.paths = []
+
+    @staticmethod
+    def to_image(pixels):
+        return Image.fromarray(pixels, "RGBA").convert("RGB")
+
+    def checkpoint(self, name, pixels):
+        for target in self.targets:
+            if target.done:
+                continue
+            if target.kind == "thumbnail" and target.at == name:
+                target.add(self.to_image(pixels))
+            elif target.start == name and target.started_at is None:
+                target.started_at = self.frame_index
+            elif target.end == name and target.started_at is not None:
+                target.done = True
+
+    def write_frame(self, pixels, repeat=1):
+        image = None
+        for index in range(self.frame_index, self.frame_index + repeat):
+            for target in self.targets:
+                if target.wants(index):
+                    if image is None:
+                        # Converted once, shared by every target on this frame
+                        image = self.to_image(pixels)
+                    target.add(image)
+        self.frame_index += repeat
+
+    def close(self):
+        from manim import logger
+
+        # Closed by the file writer, or by the caller when the render failed
+        if self.closed:
+            return
+        self.closed = True
+        for target in self.targets:
+            if not target.images:
+                logger.warning(f"Export target {target.name} captured no frames")
+                continue
+            self.paths.extend(target.save(self.directory))
+        for path in self.paths:
+            logger.info(f"Exported {path}")
+
+
+def export_checkpoint(scene, name):
+    """
+    Marks a named checkpoint for the scene's frame exporters. Does nothing
+    when the scene is rendered without export targets.
+
+    Args:
+        scene (Scene): Scene being rendered
+        name (str): Checkpoint name used by `ExportTarget` start, end or at
+    """
+    file_writer = getattr(scene.renderer, "file_writer", None)
+    for sink in getattr(file_writer, "frame_sinks", ()):
+        if hasattr(sink, "checkpoint"):
+            sink.checkpoint(name, scene.renderer.camera.pixel_array)
+
+
+def exports_directory(scene_name):
+    from manim import config
+
+    return Path(config.media_dir) / "exports" / scene_name
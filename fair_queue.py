@@ -0,0 +1,83 @@
+import random
+from collections import deque, namedtuple
+
+# Queue name used for the spammer in events; peers are numbered from 0
+SPAMMER = "spammer"
+
+# kind is one of "highlight", "process", "skip", "new_block", "unhighlight".
+# block is the processed or added block id, slot its position in the queue.
+FairQueueEvent = namedtuple(
+    "FairQueueEvent", ["kind", "queue", "block", "slot"],
+    defaults=[None, None, None])
+
+
+class FairQueue:
+    """
+    Round-robin fair queue between peers and a spammer, without any Manim
+    dependency.
+
+    `run` yields the events of the simulation one by one, so a scene can
+    animate each step as it happens and tests can run the same logic
+    headless.
+    """
+
+    def __init__(self,
+                 peer_count=3,
+                 spammer_size=8,
+                 new_block_probabilities=(0.6, 0.7, 0.8),
+                 spammer_rounds=2,
+                 rng=random):
+        self.peer_count = peer_count
+        self.new_block_probabilities = new_block_probabilities
+        # The spammer is only served in the first rounds
+        self.spammer_rounds = spammer_rounds
+        self.rng = rng
+
+        self.next_block = 0
+        self.spammer = deque(self.new_block() for _ in range(spammer_size))
+        # Each peer starts with exactly one block
+        self.peers = [deque([self.new_block()]) for _ in range(peer_count)]
+        self.processed = []
+
+    def new_block(self):
+        block = self.next_block
+        self.next_block += 1
+        return block
+
+    def queue(self, name):
+        return self.spammer if name == SPAMMER else self.peers[name]
+
+    def process(self, name):
+        block = self.queue(name).popleft()
+        self.processed.append((name, block))
+        return FairQueueEvent("process", name, block)
+
+    def add_block(self, name):
+        block = self.new_block()
+        queue = self.queue(name)
+        queue.append(block)
+        return FairQueueEvent("new_block", name, block, len(queue) - 1)
+
+    def run(self, rounds=3):
+        for round in range(rounds):
+            for i in range(self.peer_count):
+                yield FairQueueEvent("highlight", i)
+                if self.peers[i]:
+                    yield self.process(i)
+                else:
+                    yield FairQueueEvent("skip", i)
+
+            if round < self.spammer_rounds:
+                yield FairQueueEvent("highlight", SPAMMER)
+
+                # Add new transactions with different probabilities for each peer
+                for i in range(self.peer_count):
+                    if self.rng.random() < self.new_block_probabilities[i]:
+                        yield self.add_block(i)
+
+                if self.spammer:
+                    yield self.process(SPAMMER)
+                    # The spammer immediately refills its queue
+                    yield self.add_block(SPAMMER)
+
+                yield FairQueueEvent("unhighlight")
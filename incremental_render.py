@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+
+from manim import config, logger
+from manim.renderer import cairo_renderer
+
+
+class IncrementalBuild:
+    """
+    Tracks which play segments of a render were reused from earlier runs.
+
+    Every `play`/`wait` call is fingerprinted from its animations, the
+    mobject state at the start of the call, the camera and the random seed.
+    Segments whose fingerprint already has a partial movie on disk are
+    skipped entirely (no rasterization, no encoding); only the invalidated
+    segments are rendered again before Manim concatenates the partial movies.
+    """
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.segments = []
+
+    def fingerprint(self, hash_play_call, scene, *args, **kwargs):
+        play_hash = f"seed{self.seed}_{hash_play_call(scene, *args, **kwargs)}"
+        reused = scene.renderer.file_writer.is_already_cached(play_hash)
+        self.segments.append((play_hash, reused))
+        return play_hash
+
+    @property
+    def reused(self):
+        return sum(1 for _, reused in self.segments if reused)
+
+    @property
+    def rendered(self):
+        return len(self.segments) - self.reused
+
+    def summary(self):
+        return (
+            f"{len(self.segments)} segments: {self.reused} reused, "
+            f"{self.rendered} rendered"
+        )
+
+
+@contextmanager
+def incremental_hashing(build: IncrementalBuild):
+    """
+    Routes Manim's per-play cache hash through `build` for the duration of
+    the context, and makes sure partial movies survive between runs.
+
+    Args:
+        build (IncrementalBuild): Build that records the segment fingerprints
+    """
+    original_hash = cairo_renderer.get_hash_from_play_call
+    original_settings = {
+        key: config[key]
+        for key in ("disable_caching", "max_files_cached")
+    }
+
+    cairo_renderer.get_hash_from_play_call = (
+        lambda scene, *args, **kwargs: build.fingerprint(
+            original_hash, scene, *args, **kwargs)
+    )
+    config.disable_caching = False
+    # Long scenes have far more plays than the default cache size (100), and
+    # evicting old partial movies would force a full re-render next time.
+    config.max_files_cached = -1
+    try:
+        yield build
+    finally:
+        cairo_renderer.get_hash_from_play_call = original_hash
+        for key, value in original_settings.items():
+            config[key] = value
+
+
+def render_incremental(scene_class, seed=0, **scene_kwargs):
+    """
+    Renders a scene, reusing the partial movies of every play segment that is
+    unchanged since the previous run with the same seed.
+
+    Args:
+        scene_class (type): Scene class to render
+        seed (int): Seed for `random` and `numpy.random`, so that randomized
+            scenes (e.g. the fair queue's new blocks) replay identically
+        **scene_kwargs: Extra keyword arguments for the scene constructor
+
+    Returns:
+        IncrementalBuild: Per-segment fingerprints and reuse information
+    """
+    build = IncrementalBuild(seed)
+    with incremental_hashing(build):
+        scene = scene_class(random_seed=seed, **scene_kwargs)
+        scene.render()
+    logger.info(f"Incremental build of {scene_class.__name__}: {build.summary()}")
+    return build
+
+
+if __name__ == "__main__":
+    import argparse
+    import importlib
+
+    parser = argparse.ArgumentParser(
+        description="Re-render only the play segments that changed.")
+    parser.add_argument("module", help="e.g. animation_fair_queue")
+    parser.add_argument("scene", help="e.g. NanoFairQueueAnimation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scene_class = getattr(importlib.import_module(args.module), args.scene)
+    build = render_incremental(scene_class, seed=args.seed)
+    print(build.summary())
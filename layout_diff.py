@@ -0,0 +1,23 @@
+import numpy as np
+
+
+def slot_moves(current, target, atol=1e-6):
+    """
+    Returns the indices of the dots whose slot changes between two layouts.
+
+    Args:
+        current (array-like): (n, 3) positions the dots occupy now
+        target (array-like): (n, 3) positions of their slots in the new layout
+        atol (float): Distance below which a dot is considered in place
+
+    Returns:
+        np.ndarray: Indices into `current`/`target` of the dots that must move
+    """
+    current = np.asarray(current, dtype=float).reshape(-1, 3)
+    target = np.asarray(target, dtype=float).reshape(-1, 3)
+    return np.flatnonzero(np.any(np.abs(target - current) > atol, axis=1))
+
+
+def interpolate_positions(start, end, alpha):
+    """Positions of all moving dots at `alpha` in [0, 1], in one array op."""
+    return start + alpha * (end - start)
@@ -0,0 +1,149 @@
+import os
+
+
+def current_rss():
+    """Resident set size of this process in bytes (peak RSS where the
+    current value is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class DotPool:
+    """
+    Recycles retired Dot mobjects instead of constructing a new one for
+    every streamed or new block.
+    """
+
+    def __init__(self):
+        self.free_dots = {}
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, point=None, radius=0.08, color=None):
+        from manim import ORIGIN, WHITE, Dot
+
+        point = ORIGIN if point is None else point
+        color = WHITE if color is None else color
+        free_dots = self.free_dots.get(radius)
+        if not free_dots:
+            self.created += 1
+            return Dot(point=point, radius=radius, color=color)
+
+        # Reset whatever the last animations left on the dot
+        self.reused += 1
+        dot = free_dots.pop()
+        dot.clear_updaters()
+        dot.set_fill(color, opacity=1)
+        dot.set_stroke(width=0)
+        dot.move_to(point)
+        return dot
+
+    def release(self, dot):
+        self.free_dots.setdefault(dot.radius, []).append(dot)
+
+
+class LongRunMonitor:
+    """
+    Keeps long renders flat in memory.
+
+    Every `gc_interval` steps, the members of the tracked containers (lists
+    or VGroups of finished items, such as processed or confirmed dots) that
+    are off-screen or fully transparent are removed from the scene and from
+    their container, and retired Dots go back to the pool. Nothing outside
+    the tracked containers is ever retired, so live queue state must not be
+    tracked. Every `report_interval` steps the live mobject count and the RSS
+    are logged.
+    """
+
+    def __init__(self, scene, gc_interval=50, report_interval=500, margin=0.5):
+        self.scene = scene
+        self.gc_interval = gc_interval
+        self.report_interval = report_interval
+        # How far outside the frame a mobject must be before it is retired
+        self.margin = margin
+        self.dot_pool = DotPool()
+        self.containers = []
+        self.steps = 0
+        self.retired = 0
+
+    def track(self, container):
+        self.containers.append(container)
+        return container
+
+    def is_retirable(self, mobject):
+        from manim import VMobject, config
+
+        family = [m for m in mobject.get_family() if m.has_points()]
+        if not family:
+            return False
+
+        x_limit = config.frame_x_radius + self.margin
+        y_limit = config.frame_y_radius + self.margin
+        if (mobject.get_left()[0] > x_limit or mobject.get_right()[0] < -x_limit
+                or mobject.get_bottom()[1] > y_limit or mobject.get_top()[1] < -y_limit):
+            return True
+
+        return all(
+            isinstance(m, VMobject)
+            and m.get_fill_opacity() == 0
+            and (m.get_stroke_width() == 0 or m.get_stroke_opacity() == 0)
+            for m in family
+        )
+
+    def collect(self):
+        """Retires finished mobjects that left the frame; returns how many."""
+        from manim import Dot
+
+        retired = {}
+        for container in self.containers:
+            members = container if isinstance(container, list) \
+                else container.submobjects
+            for mob in members:
+                if id(mob) not in retired and self.is_retirable(mob):
+                    retired[id(mob)] = mob
+        if not retired:
+            return 0
+
+        retired_ids = set(retired)
+        retired = list(retired.values())
+
+        self.scene.remove(*retired)
+        for container in self.containers:
+            if isinstance(container, list):
+                container[:] = [m for m in container if id(m) not in retired_ids]
+            else:
+                container.remove(*[m for m in container.submobjects
+                                   if id(m) in retired_ids])
+        for mob in retired:
+            if isinstance(mob, Dot):
+                self.dot_pool.release(mob)
+
+        self.retired += len(retired)
+        return len(retired)
+
+    def step(self):
+        self.steps += 1
+        if self.gc_interval and self.steps % self.gc_interval == 0:
+            self.collect()
+        if self.report_interval and self.steps % self.report_interval == 0:
+            self.report()
+
+    def report(self):
+        from manim import logger
+
+        live = len(self.scene.mobjects)
+        family = len(self.scene.get_mobject_family_members())
+        logger.info(
+            f"Long run step {self.steps}: {live} live mobjects ({family} "
+            f"with submobjects), {self.retired} retired, "
+            f"{self.dot_pool.reused} dots reused, "
+            f"RSS {current_rss() / 2**20:.1f} MiB"
+        )
@@ -0,0 +1,192 @@
+from fractions import Fraction
+from pathlib import Path
+from queue import Queue
+from threading import Thread
+
+# Social and web cuts rendered next to the main 1080p60 video
+DEFAULT_VARIANTS = ["720p60", "480p30"]
+
+
+def parse_variant(spec: str) -> tuple:
+    """
+    Parses a variant like "720p", "720p30" or "480" into (height, frame_rate).
+    A frame rate of None keeps the rate of the main render.
+    """
+    height, _, frame_rate = spec.lower().partition("p")
+    return int(height), int(frame_rate) if frame_rate else None
+
+
+class ResolutionEncoder:
+    """
+    Downscales and encodes one output variant on its own worker thread.
+
+    Frames arrive as full-resolution `av.VideoFrame`s; scaling (swscale) and
+    encoding both happen on the worker, so several variants encode at the
+    same time while the renderer moves on.
+    """
+
+    def __init__(self, path, width, height, frame_rate, codec="libx264",
+                 pixel_format="yuv420p", queue_size=8):
+        import av
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.width = width
+        self.height = height
+        self.pixel_format = pixel_format
+        self.time_base = Fraction(1, frame_rate)
+        self.next_pts = 0
+        self.error = None
+
+        self.container = av.open(str(self.path), mode="w")
+        self.stream = self.container.add_stream(codec, rate=frame_rate)
+        self.stream.width = width
+        self.stream.height = height
+        self.stream.pix_fmt = pixel_format
+
+        self.queue = Queue(maxsize=queue_size)
+        self.worker = Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def put(self, frame):
+        self.queue.put(frame)
+
+    def _run(self):
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                scaled = frame.reformat(width=self.width, height=self.height,
+                                        format=self.pixel_format)
+                scaled.pts = self.next_pts
+                scaled.time_base = self.time_base
+                self.next_pts += 1
+                for packet in self.stream.encode(scaled):
+                    self.container.mux(packet)
+            except BaseException as error:
+                self.error = error
+
+        try:
+            if self.error is None:
+                for packet in self.stream.encode():
+                    self.container.mux(packet)
+        finally:
+            self.container.close()
+
+    def close(self):
+        self.queue.put(None)
+        self.worker.join()
+        if self.error is not None:
+            raise self.error
+
+
+class MultiResolutionSink:
+    """
+    Frame sink for `render_pipeline.PipelinedFileWriter` that streams every
+    rendered frame to one `ResolutionEncoder` per variant.
+
+    The full-resolution frame is converted once per rendered frame and
+    shared by all variants. Variants with a lower frame rate keep every n-th
+    frame of the main render.
+    """
+
+    def __init__(self, scene_name, variants=DEFAULT_VARIANTS):
+        from manim import config
+
+        source_rate = int(config.frame_rate)
+        # Every variant is checked before the first encoder opens its file
+        outputs = []
+        for spec in variants:
+            height, frame_rate = parse_variant(spec)
+            frame_rate = frame_rate or source_rate
+            if height > config.pixel_height:
+                raise ValueError(
+                    f"Variant {spec}: {height}p is above the render "
+                    f"resolution ({config.pixel_height}p); variants can only "
+                    f"be downscaled")
+            if source_rate % frame_rate:
+                raise ValueError(
+                    f"Variant {spec}: {frame_rate} fps does not divide the "
+                    f"render frame rate ({source_rate} fps)")
+            # Keep the aspect ratio, with even dimensions for yuv420p
+            width = round(config.pixel_width * height / config.pixel_height / 2) * 2
+            path = (Path(config.media_dir) / "videos" / f"{height}p{frame_rate}"
+                    / f"{scene_name}.mp4")
+            outputs.append((path, width, height, frame_rate))
+
+        self.frame_index = 0
+        self.closed = False
+        self.encoders = []
+        try:
+            for path, width, height, frame_rate in outputs:
+                self.encoders.append(
+                    (source_rate // frame_rate,
+                     ResolutionEncoder(path, width, height, frame_rate)))
+        except BaseException:
+            self.close()
+            raise
+
+    def write_frame(self, pixels, repeat=1):
+        import av
+
+        frame = av.VideoFrame.from_ndarray(pixels, format="rgba")
+        for _ in range(repeat):
+            for step, encoder in self.encoders:
+                if self.frame_index % step == 0:
+                    encoder.put(frame)
+            self.frame_index += 1
+
+    def close(self):
+        # Closed by the file writer, or by the caller when the render failed
+        if self.closed:
+            return
+        self.closed = True
+        errors = []
+        for _, encoder in self.encoders:
+            try:
+                encoder.close()
+            except BaseException as error:
+                errors.append(error)
+        if errors:
+            raise errors[0]
+
+    @property
+    def paths(self):
+        return [encoder.path for _, encoder in self.encoders]
+
+
+def render_multi_resolution(scene_class, variants=DEFAULT_VARIANTS,
+                            **scene_kwargs):
+    """
+    Renders a scene once at the configured (highest) quality and writes the
+    lower-resolution variants from the same frames.
+
+    Caching is disabled for this render: a play segment reused from the
+    cache is never rasterized, so its frames would be missing from the
+    variants.
+
+    Args:
+        scene_class (type): Scene class to render
+        variants (list): Variants such as "720p60" or "480p30"
+        **scene_kwargs: Extra keyword arguments for the scene constructor
+
+    Returns:
+        list: Paths of the variant videos
+    """
+    from manim import tempconfig
+
+    from render_pipeline import PipelinedRenderer
+
+    with tempconfig({"disable_caching": True}):
+        sink = MultiResolutionSink(scene_class.__name__, variants)
+        try:
+            scene = scene_class(renderer=PipelinedRenderer(frame_sinks=[sink]),
+                                **scene_kwargs)
+            scene.render()
+        finally:
+            # Already closed by the file writer unless the render failed
+            sink.close()
+    return sink.paths
@@ -1,230 +1,22 @@
 from manim import *
-import numpy as np
-
-
-class QueueSystem:
-    def __init__(self,
-                 queue_height=0.7,
-                 queue_width=4,
-                 active_width=2,
-                 dot_radius=0.05,
-                 dot_spacing=0.12,
-                 item_color="#FF4444",
-                 queue_color=BLUE,
-                 active_color=YELLOW,
-                 queue_opacity=0.2,
-                 active_opacity=0.3,
-                 position=LEFT * 3,
-                 left_label="<0.000001X"):
-        self.QUEUE_HEIGHT = queue_height
-        self.QUEUE_WIDTH = queue_width
-        self.ACTIVE_WIDTH = active_width
-        self.DOT_RADIUS = dot_radius
-        self.DOT_SPACING = dot_spacing
-        self.ITEM_COLOR = item_color
-        self.QUEUE_COLOR = queue_color
-        self.ACTIVE_COLOR = active_color
-        self.QUEUE_OPACITY = queue_opacity
-        self.ACTIVE_OPACITY = active_opacity
-        self.POSITION = position
-        self.LEFT_LABEL = left_label
-
-        self.blue_dots = []
-        self.active_dots = []
-        self.confirmed_dots = []
-
-        # Calculate important positions
-        self.queue_left = self.POSITION[0] - self.QUEUE_WIDTH/2
-        self.queue_right = self.POSITION[0] + self.QUEUE_WIDTH/2
-        self.active_left = self.queue_right
-        self.active_right = self.queue_right + self.ACTIVE_WIDTH
-        self.queue_top = self.POSITION[1] + self.QUEUE_HEIGHT/2
-        self.queue_bottom = self.POSITION[1] - self.QUEUE_HEIGHT/2
-
-    def create_containers(self, scene):
-        # Create containers group
-        self.containers = VGroup()
-
-        # Create and position the blue section
-        self.blue_section = Rectangle(
-            width=self.QUEUE_WIDTH,
-            height=self.QUEUE_HEIGHT,
-            color=self.QUEUE_COLOR,
-            fill_opacity=self.QUEUE_OPACITY
-        ).move_to(self.POSITION)
-
-        # Create and position the active section
-        self.active_section = Rectangle(
-            width=self.ACTIVE_WIDTH,
-            height=self.QUEUE_HEIGHT,
-            color=self.ACTIVE_COLOR,
-            fill_opacity=self.ACTIVE_OPACITY
-        ).next_to(self.blue_section, RIGHT, buff=0)
-
-        # Create left label only
-        self.queue_label = Text(
-            self.LEFT_LABEL,
-            font_size=24
-        ).next_to(self.blue_section, LEFT)
-
-        # Add elements to the containers group
-        self.containers.add(
-            self.blue_section,
-            self.active_section,
-            self.queue_label
-        )
-
-        scene.play(
-            Create(self.blue_section),
-            Create(self.active_section),
-            Write(self.queue_label)
-        )
-
-    def create_dot(self, position):
-        return Dot(
-            point=position,
-            radius=self.DOT_RADIUS,
-            color=self.ITEM_COLOR
-        )
-
-    def calculate_grid_dimensions(self, width, height, margin=0.1):
-        # Calculate how many dots can fit in each dimension
-        usable_width = width - (2 * margin)
-        usable_height = height - (2 * margin)
-        dots_per_row = int(usable_width / self.DOT_SPACING)
-        rows = int(usable_height / self.DOT_SPACING)
-        return dots_per_row, rows
-
-    def get_blue_grid_position(self, index):
-        dots_per_row, rows = self.calculate_grid_dimensions(
-            self.QUEUE_WIDTH,
-            self.QUEUE_HEIGHT
-        )
 
-        row = index // dots_per_row
-        # Fill from right to left
-        col = dots_per_row - 1 - (index % dots_per_row)
+from export import export_checkpoint
+from long_run import LongRunMonitor
+from queue_system import QueueSystem, play_compaction
 
-        # Calculate actual x,y coordinates
-        x = self.queue_right - (self.DOT_SPACING * (dots_per_row - col))
-        y = self.queue_top - self.DOT_SPACING - (row * self.DOT_SPACING)
-
-        return np.array([x, y, 0])
-
-    def get_active_grid_position(self, index):
-        dots_per_row, rows = self.calculate_grid_dimensions(
-            self.ACTIVE_WIDTH,
-            self.QUEUE_HEIGHT
-        )
-
-        row = index // dots_per_row
-        col = index % dots_per_row
-
-        # Calculate actual x,y coordinates
-        x = self.active_left + self.DOT_SPACING + (col * self.DOT_SPACING)
-        y = self.queue_top - self.DOT_SPACING - (row * self.DOT_SPACING)
-
-        return np.array([x, y, 0])
-
-    def get_confirmed_position(self, index):
-        x = self.active_right + self.DOT_SPACING + (index * self.DOT_SPACING)
-        y = self.POSITION[1]  # Same height as queue center
-        return np.array([x, y, 0])
-
-    def initialize_state(self, scene, initial_queue=100, initial_active=60):
-        # Calculate maximum capacity
-        queue_dots_per_row, queue_rows = self.calculate_grid_dimensions(
-            self.QUEUE_WIDTH,
-            self.QUEUE_HEIGHT
-        )
-        active_dots_per_row, active_rows = self.calculate_grid_dimensions(
-            self.ACTIVE_WIDTH,
-            self.QUEUE_HEIGHT
-        )
-
-        queue_capacity = queue_dots_per_row * queue_rows
-        active_capacity = active_dots_per_row * active_rows
-
-        # Limit initial states to capacity
-        initial_queue = min(initial_queue, queue_capacity)
-        initial_active = min(initial_active, active_capacity)
-
-        for i in range(initial_active):
-            pos = self.get_active_grid_position(i)
-            dot = self.create_dot(pos)
-            self.active_dots.append(dot)
-            scene.add(dot)
-
-        for i in range(initial_queue):
-            pos = self.get_blue_grid_position(i)
-            dot = self.create_dot(pos)
-            self.blue_dots.append(dot)
-            scene.add(dot)
-
-    def get_stream_animations(self, count, run_time=0.15, direct_to_active=False):
-        animations = []
-        for _ in range(count):
-            start_pos = np.array([self.queue_left - 1, self.POSITION[1], 0])
-            new_dot = self.create_dot(start_pos)
-
-            if direct_to_active:
-                # Go directly to active section
-                final_pos = self.get_active_grid_position(
-                    len(self.active_dots))
-                self.active_dots.append(new_dot)
-            else:
-                # Go to blue queue
-                final_pos = self.get_blue_grid_position(len(self.blue_dots))
-                self.blue_dots.append(new_dot)
-
-            animations.append(Create(new_dot, run_time=run_time))
-            animations.append(new_dot.animate.move_to(
-                final_pos).set_run_time(run_time))
-
-        return animations
-
-    def get_confirm_animations(self, run_time_confirm=0.3, run_time_replace=0.2):
-        animations = []
-        if len(self.active_dots) > 0:
-            # Select random dot from active section
-            random_index = np.random.randint(0, len(self.active_dots))
-            dot_to_move = self.active_dots.pop(random_index)
-            random_pos = dot_to_move.get_center()
-
-            # Move to confirmed section
-            confirmed_pos = self.get_confirmed_position(
-                len(self.confirmed_dots))
-            self.confirmed_dots.append(dot_to_move)
-            animations.append(dot_to_move.animate.move_to(
-                confirmed_pos).set_run_time(run_time_confirm))
-
-            # If there are dots in blue section, move one to the vacated position
-            if len(self.blue_dots) > 0:
-                replacement_dot = self.blue_dots.pop(0)
-                self.active_dots.insert(random_index, replacement_dot)
-                animations.append(replacement_dot.animate.move_to(
-                    random_pos).set_run_time(run_time_replace))
-        elif len(self.blue_dots) > 0:
-            # If no active dots, move from blue to active then confirm
-            dot_to_move = self.blue_dots.pop(0)
-            active_pos = self.get_active_grid_position(len(self.active_dots))
-            self.active_dots.append(dot_to_move)
-            animations.append(dot_to_move.animate.move_to(
-                active_pos).set_run_time(run_time_replace))
-
-            # Move to confirmed
-            self.active_dots.remove(dot_to_move)
-            confirmed_pos = self.get_confirmed_position(
-                len(self.confirmed_dots))
-            self.confirmed_dots.append(dot_to_move)
-            animations.append(dot_to_move.animate.move_to(
-                confirmed_pos).set_run_time(run_time_confirm))
-
-        return animations
+# Confirmed dots pile up to the right of the buckets: retire the ones that
+# left the frame after every confirmation round and recycle them for new
+# blocks. report_interval > 0 also logs memory use.
+LONG_RUN = {
+    'gc_interval': 1,
+    'report_interval': 0
+}
 
 
 class MultiQueueScene(Scene):
     def construct(self):
+        monitor = LongRunMonitor(self, **LONG_RUN)
+
         # Standard dimensions for all queues
         STANDARD_HEIGHT = 0.7
         STANDARD_QUEUE_WIDTH = 4
@@ -237,7 +29,9 @@ class MultiQueueScene(Scene):
             active_width=STANDARD_ACTIVE_WIDTH,
             item_color="#FF4444",
             position=UP * 1.5,
-            left_label="<0.000001X"
+            left_label="<0.000001X",
+            compact=True,
+            dot_pool=monitor.dot_pool
         )
 
         bucket2 = QueueSystem(
@@ -247,7 +41,9 @@ class MultiQueueScene(Scene):
             item_color="#FFAA44",
             queue_color=BLUE_B,
             position=ORIGIN,
-            left_label="1X ... 3X"
+            left_label="1X ... 3X",
+            compact=True,
+            dot_pool=monitor.dot_pool
         )
 
         bucket3 = QueueSystem(
@@ -257,9 +53,15 @@ class MultiQueueScene(Scene):
             item_color="#44FF44",
             queue_color=BLUE_C,
             position=DOWN * 1.5,
-            left_label="10X ... 30X"
+            left_label="10X ... 30X",
+            compact=True,
+            dot_pool=monitor.dot_pool
         )
 
+        buckets = [bucket1, bucket2, bucket3]
+        for bucket in buckets:
+            monitor.track(bucket.confirmed_dots)
+
         # Define different initial states for each queue
         queue_configs = [
             (bucket1, 0, 0),    # High priority: lots of blocks
@@ -315,6 +117,8 @@ class MultiQueueScene(Scene):
         animations = []
         animations.extend(bucket1.get_confirm_animations())
         self.play(AnimationGroup(*animations, lag_ratio=0.1))
+        play_compaction(self, buckets)
+        monitor.step()
 
         self.wait(0.3)
         animations = []
@@ -326,6 +130,8 @@ class MultiQueueScene(Scene):
         animations = []
         animations.extend(bucket1.get_confirm_animations())
         self.play(AnimationGroup(*animations, lag_ratio=0.1))
+        play_compaction(self, buckets)
+        monitor.step()
 
         # First round of parallel actions
         animations = []
@@ -337,6 +143,7 @@ class MultiQueueScene(Scene):
         self.play(AnimationGroup(*animations, lag_ratio=0.1))
 
         # First round of parallel confirmations
+        export_checkpoint(self, "confirmations")
         confirm_animations = []
         confirm_animations.extend(
             bucket1.get_stream_animations(5, run_time=0.1))
@@ -344,6 +151,8 @@ class MultiQueueScene(Scene):
         confirm_animations.extend(bucket2.get_confirm_animations())
         confirm_animations.extend(bucket3.get_confirm_animations())
         self.play(AnimationGroup(*confirm_animations, lag_ratio=0.1))
+        play_compaction(self, buckets)
+        monitor.step()
 
         # Second round of parallel actions
         animations = []
@@ -362,6 +171,9 @@ class MultiQueueScene(Scene):
         confirm_animations.extend(bucket2.get_confirm_animations())
         confirm_animations.extend(bucket3.get_confirm_animations())
         self.play(AnimationGroup(*confirm_animations, lag_ratio=0.1))
+        play_compaction(self, buckets)
+        monitor.step()
+        export_checkpoint(self, "confirmations_end")
 
         # Final round
         animations = []
@@ -375,16 +187,34 @@ class MultiQueueScene(Scene):
         confirm_animations.extend(bucket1.get_confirm_animations())
         confirm_animations.extend(bucket3.get_confirm_animations())
         self.play(AnimationGroup(*confirm_animations, lag_ratio=0.1))
+        play_compaction(self, buckets)
+        monitor.step()
 
         self.wait(0.3)
 
 
-# Rendering configuration
-config.frame_rate = 30  # Set frame rate to 30 fps
-config.renderer = "cairo"  # Use cairo renderer for better quality
-config.output_file = "election_system.mp4"  # Set output filename
-config.quality = "high_quality"  # Use high quality preset
+# Rendering configuration, applied per render by cli.render_settings
+# The high quality preset's 60 fps applies, as for the other animations
+RENDER_SETTINGS = {
+    'quality': "high_quality",  # Use high quality preset
+    'renderer': "cairo",  # Use cairo renderer for better quality
+    'output_file': "election_system.mp4",  # Set output filename
+}
+
+# Stills and loops captured while rendering with `cli.py render --export`
+EXPORT_TARGETS = [
+    {'name': "bucket_confirmations_thumbnail", 'kind': "thumbnail",
+     'at': "confirmations_end", 'width': 1280},
+    {'name': "bucket_confirmations", 'kind': "gif",
+     'start': "confirmations", 'end': "confirmations_end", 'fps': 15},
+    {'name': "bucket_confirmations_sprites", 'kind': "sprites",
+     'start': "confirmations", 'end': "confirmations_end", 'fps': 5,
+     'width': 320},
+]
 
 if __name__ == "__main__":
-    intro_scene = MultiQueueScene()
-    intro_scene.render()
+    from cli import render_settings
+
+    with render_settings(RENDER_SETTINGS):
+        intro_scene = MultiQueueScene()
+        intro_scene.render()
@@ -0,0 +1,70 @@
+"""
+Throughput benchmark for the queue models.
+
+    python queue_benchmark.py
+
+Runs headless (NumPy only), so it can be used before swapping the queue
+models' data structures. The invariants are covered by
+test_queue_models.py.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from fair_queue import FairQueue
+from queue_system import QueueModel
+
+
+def measure_queue_throughput(sizes=(100, 1000, 10000)):
+    """
+    Streams `size` dots into a QueueModel, then confirms them all with
+    compaction, and reports operations per second for each size.
+    """
+    results = []
+    for size in sizes:
+        np.random.seed(0)
+        model = QueueModel()
+        start = time.perf_counter()
+        model.stream(size)
+        for _ in range(size):
+            model.confirm()
+            model.compact()
+        elapsed = time.perf_counter() - start
+        operations = 2 * size + 1
+        results.append((size, operations / elapsed))
+    return results
+
+
+def measure_fair_queue_throughput(sizes=(100, 1000, 10000)):
+    """Runs the fair queue with `size` peers for ten rounds."""
+    results = []
+    for size in sizes:
+        fair_queue = FairQueue(
+            peer_count=size,
+            new_block_probabilities=[0.7] * size,
+            rng=random.Random(0)
+        )
+        start = time.perf_counter()
+        events = sum(1 for _ in fair_queue.run(rounds=10))
+        elapsed = time.perf_counter() - start
+        results.append((size, events / elapsed))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[100, 1000, 10000],
+                        help="Queue sizes and peer counts to measure")
+    args = parser.parse_args(argv)
+
+    for size, rate in measure_queue_throughput(args.sizes):
+        print(f"QueueModel  size {size:>6}: {rate:>12,.0f} ops/sec")
+    for size, rate in measure_fair_queue_throughput(args.sizes):
+        print(f"FairQueue  peers {size:>6}: {rate:>12,.0f} events/sec")
+
+
+if __name__ == "__main__":
+    main()
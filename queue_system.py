@@ -0,0 +1,461 @@
+import numpy as np
+
+from layout_diff import interpolate_positions, slot_moves
+
+
+class QueueItem:
+    """Stand-in for a Dot when the queue runs without Manim."""
+
+    def __init__(self, position):
+        self.slot_position = np.asarray(position, dtype=float)
+
+
+class QueueModel:
+    """
+    Queue layout and bookkeeping of a priority bucket, without any Manim
+    dependency.
+
+    Every state change returns the moves it implies, as (dot, position)
+    pairs, so the same logic can drive an animation (`QueueSystem`) or run
+    headless in tests and simulations.
+    """
+
+    def __init__(self,
+                 queue_height=0.7,
+                 queue_width=4,
+                 active_width=2,
+                 dot_radius=0.05,
+                 dot_spacing=0.12,
+                 item_color="#FF4444",
+                 queue_color=None,
+                 active_color=None,
+                 queue_opacity=0.2,
+                 active_opacity=0.3,
+                 position=(-3, 0, 0),
+                 left_label="<0.000001X",
+                 compact=False,
+                 dot_pool=None):
+        self.QUEUE_HEIGHT = queue_height
+        self.QUEUE_WIDTH = queue_width
+        self.ACTIVE_WIDTH = active_width
+        self.DOT_RADIUS = dot_radius
+        self.DOT_SPACING = dot_spacing
+        self.ITEM_COLOR = item_color
+        self.QUEUE_COLOR = queue_color
+        self.ACTIVE_COLOR = active_color
+        self.QUEUE_OPACITY = queue_opacity
+        self.ACTIVE_OPACITY = active_opacity
+        self.POSITION = np.asarray(position, dtype=float)
+        self.LEFT_LABEL = left_label
+        # Let play_compaction close the gaps left behind by confirmations
+        self.COMPACT = compact
+        # Optional long_run.DotPool to recycle retired dots
+        self.dot_pool = dot_pool
+
+        self.blue_dots = []
+        self.active_dots = []
+        self.confirmed_dots = []
+        # The blue queue is a ring buffer over its grid slots: the head moves
+        # forward on every confirmation instead of shifting the whole queue
+        self.blue_head = 0
+        # Confirmed dots may be retired from confirmed_dots on long runs, so
+        # confirmed positions are numbered separately
+        self.confirmed_count = 0
+
+        # Calculate important positions
+        self.queue_left = self.POSITION[0] - self.QUEUE_WIDTH/2
+        self.queue_right = self.POSITION[0] + self.QUEUE_WIDTH/2
+        self.active_left = self.queue_right
+        self.active_right = self.queue_right + self.ACTIVE_WIDTH
+        self.queue_top = self.POSITION[1] + self.QUEUE_HEIGHT/2
+        self.queue_bottom = self.POSITION[1] - self.QUEUE_HEIGHT/2
+
+    def create_dot(self, position):
+        return QueueItem(position)
+
+    def assign_slot(self, dot, position):
+        # Remember where the dot ends up once its animations have played, so
+        # layout diffs do not depend on animations that are still pending
+        dot.slot_position = np.asarray(position, dtype=float)
+        return position
+
+    def calculate_grid_dimensions(self, width, height, margin=0.1):
+        # Calculate how many dots can fit in each dimension
+        usable_width = width - (2 * margin)
+        usable_height = height - (2 * margin)
+        dots_per_row = int(usable_width / self.DOT_SPACING)
+        rows = int(usable_height / self.DOT_SPACING)
+        return dots_per_row, rows
+
+    def get_blue_grid_positions(self, indices):
+        dots_per_row, rows = self.calculate_grid_dimensions(
+            self.QUEUE_WIDTH,
+            self.QUEUE_HEIGHT
+        )
+
+        indices = np.asarray(indices)
+        row = indices // dots_per_row
+        # Fill from right to left
+        col = dots_per_row - 1 - (indices % dots_per_row)
+
+        # Calculate actual x,y coordinates
+        x = self.queue_right - (self.DOT_SPACING * (dots_per_row - col))
+        y = self.queue_top - self.DOT_SPACING - (row * self.DOT_SPACING)
+
+        return np.column_stack([x, y, np.zeros(len(indices))])
+
+    def get_blue_grid_position(self, index):
+        return self.get_blue_grid_positions([index])[0]
+
+    @property
+    def blue_capacity(self):
+        dots_per_row, rows = self.calculate_grid_dimensions(
+            self.QUEUE_WIDTH,
+            self.QUEUE_HEIGHT
+        )
+        return dots_per_row * rows
+
+    def get_blue_queue_positions(self, indices):
+        """
+        Grid positions of the blue dots at the given queue indices. Queue
+        indices wrap around the grid from the head slot; dots beyond the
+        grid's capacity overflow into the rows below it.
+        """
+        indices = np.asarray(indices)
+        capacity = self.blue_capacity
+        if capacity:
+            indices = np.where(indices < capacity,
+                               (self.blue_head + indices) % capacity, indices)
+        return self.get_blue_grid_positions(indices)
+
+    def get_blue_queue_position(self, index):
+        return self.get_blue_queue_positions([index])[0]
+
+    def pop_blue_head(self):
+        """
+        Removes the first queued dot. The other dots keep their slots, except
+        the first overflowing dot, which takes over the vacated slot.
+
+        Returns:
+            tuple: The removed dot and the (dot, position) move of the
+                overflowing dot, or None
+        """
+        dot = self.blue_dots.pop(0)
+        capacity = self.blue_capacity
+        if not self.blue_dots:
+            self.blue_head = 0
+        elif capacity:
+            self.blue_head = (self.blue_head + 1) % capacity
+
+        if capacity and len(self.blue_dots) >= capacity:
+            overflow_dot = self.blue_dots[capacity - 1]
+            position = self.get_blue_queue_position(capacity - 1)
+            self.assign_slot(overflow_dot, position)
+            return dot, (overflow_dot, position)
+        return dot, None
+
+    def get_active_grid_positions(self, indices):
+        dots_per_row, rows = self.calculate_grid_dimensions(
+            self.ACTIVE_WIDTH,
+            self.QUEUE_HEIGHT
+        )
+
+        indices = np.asarray(indices)
+        row = indices // dots_per_row
+        col = indices % dots_per_row
+
+        # Calculate actual x,y coordinates
+        x = self.active_left + self.DOT_SPACING + (col * self.DOT_SPACING)
+        y = self.queue_top - self.DOT_SPACING - (row * self.DOT_SPACING)
+
+        return np.column_stack([x, y, np.zeros(len(indices))])
+
+    def get_active_grid_position(self, index):
+        return self.get_active_grid_positions([index])[0]
+
+    def get_confirmed_position(self, index):
+        x = self.active_right + self.DOT_SPACING + (index * self.DOT_SPACING)
+        y = self.POSITION[1]  # Same height as queue center
+        return np.array([x, y, 0])
+
+    def fill(self, initial_queue=100, initial_active=60):
+        # Calculate maximum capacity
+        queue_dots_per_row, queue_rows = self.calculate_grid_dimensions(
+            self.QUEUE_WIDTH,
+            self.QUEUE_HEIGHT
+        )
+        active_dots_per_row, active_rows = self.calculate_grid_dimensions(
+            self.ACTIVE_WIDTH,
+            self.QUEUE_HEIGHT
+        )
+
+        queue_capacity = queue_dots_per_row * queue_rows
+        active_capacity = active_dots_per_row * active_rows
+
+        # Limit initial states to capacity
+        initial_queue = min(initial_queue, queue_capacity)
+        initial_active = min(initial_active, active_capacity)
+
+        dots = []
+        for i in range(initial_active):
+            pos = self.get_active_grid_position(i)
+            dot = self.create_dot(pos)
+            self.assign_slot(dot, pos)
+            self.active_dots.append(dot)
+            dots.append(dot)
+
+        for i in range(len(self.blue_dots), len(self.blue_dots) + initial_queue):
+            pos = self.get_blue_queue_position(i)
+            dot = self.create_dot(pos)
+            self.assign_slot(dot, pos)
+            self.blue_dots.append(dot)
+            dots.append(dot)
+
+        return dots
+
+    def stream(self, count, direct_to_active=False):
+        """Adds `count` new dots; returns their (dot, final_pos) moves."""
+        moves = []
+        for _ in range(count):
+            start_pos = np.array([self.queue_left - 1, self.POSITION[1], 0])
+            new_dot = self.create_dot(start_pos)
+
+            if direct_to_active:
+                # Go directly to active section
+                final_pos = self.get_active_grid_position(
+                    len(self.active_dots))
+                self.active_dots.append(new_dot)
+            else:
+                # Go to blue queue
+                final_pos = self.get_blue_queue_position(len(self.blue_dots))
+                self.blue_dots.append(new_dot)
+            self.assign_slot(new_dot, final_pos)
+            moves.append((new_dot, final_pos))
+
+        return moves
+
+    def confirm(self):
+        """
+        Confirms one active dot (or, with no active dots, the first queued
+        one) and refills the vacated active slot from the head of the queue,
+        or from the tail of the active section when the queue is empty. All
+        other dots keep their slots.
+
+        Returns:
+            list: (dot, position, step) moves in order, where step is
+                "confirm" or "replace"
+        """
+        moves = []
+        if len(self.active_dots) > 0:
+            # Select random dot from active section
+            random_index = np.random.randint(0, len(self.active_dots))
+            dot_to_move = self.active_dots[random_index]
+            random_pos = dot_to_move.slot_position
+
+            # Move to confirmed section
+            confirmed_pos = self.get_confirmed_position(self.confirmed_count)
+            self.confirmed_count += 1
+            self.confirmed_dots.append(dot_to_move)
+            moves.append((dot_to_move, confirmed_pos, "confirm"))
+
+            # If there are dots in blue section, move one to the vacated
+            # position, otherwise fill it from the tail of the active section
+            overflow_move = None
+            if len(self.blue_dots) > 0:
+                replacement_dot, overflow_move = self.pop_blue_head()
+            else:
+                replacement_dot = self.active_dots.pop()
+            if replacement_dot is not dot_to_move:
+                self.active_dots[random_index] = replacement_dot
+                self.assign_slot(replacement_dot, random_pos)
+                moves.append((replacement_dot, random_pos, "replace"))
+            if overflow_move is not None:
+                moves.append((*overflow_move, "replace"))
+        elif len(self.blue_dots) > 0:
+            # If no active dots, move from blue to active then confirm
+            dot_to_move, overflow_move = self.pop_blue_head()
+            if overflow_move is not None:
+                moves.append((*overflow_move, "replace"))
+            active_pos = self.get_active_grid_position(len(self.active_dots))
+            moves.append((dot_to_move, active_pos, "replace"))
+
+            # Move to confirmed
+            confirmed_pos = self.get_confirmed_position(self.confirmed_count)
+            self.confirmed_count += 1
+            self.confirmed_dots.append(dot_to_move)
+            moves.append((dot_to_move, confirmed_pos, "confirm"))
+
+        return moves
+
+    def compact(self, blue_order=None):
+        """
+        Assigns every queued and active dot the slot matching its index,
+        with the head of the queue back in the first slot next to the active
+        section.
+
+        `confirm` keeps slots stable, so the queue drifts away from the
+        active section as its head advances; this closes that gap, along
+        with the overflow rows and any reordering by `blue_order`, in one
+        batch of moves.
+
+        Args:
+            blue_order (array-like): Optional permutation of the blue queue,
+                e.g. `np.argsort(priorities)` for a sorted-by-priority view
+
+        Returns:
+            tuple: (dots, start, end) for the dots whose slot changed only,
+                with their old and new positions as (n, 3) arrays
+        """
+        if blue_order is not None:
+            self.blue_dots = [self.blue_dots[i] for i in blue_order]
+        self.blue_head = 0
+
+        dots = self.blue_dots + self.active_dots
+        if not dots:
+            return [], np.empty((0, 3)), np.empty((0, 3))
+
+        current = np.array([dot.slot_position for dot in dots])
+        target = np.vstack([
+            self.get_blue_grid_positions(np.arange(len(self.blue_dots))),
+            self.get_active_grid_positions(np.arange(len(self.active_dots)))
+        ])
+        moved = slot_moves(current, target)
+
+        moving_dots = [dots[i] for i in moved]
+        start, end = current[moved], target[moved]
+        for dot, position in zip(moving_dots, end):
+            self.assign_slot(dot, position)
+        return moving_dots, start, end
+
+
+class QueueSystem(QueueModel):
+    """
+    Animated priority bucket. Manim is imported when the first mobject or
+    animation is built, so the model above stays importable without it.
+    """
+
+    def create_containers(self, scene):
+        from manim import BLUE, LEFT, RIGHT, YELLOW, Create, Rectangle, Text, VGroup, Write
+
+        # Create containers group
+        self.containers = VGroup()
+
+        # Create and position the blue section
+        self.blue_section = Rectangle(
+            width=self.QUEUE_WIDTH,
+            height=self.QUEUE_HEIGHT,
+            color=self.QUEUE_COLOR or BLUE,
+            fill_opacity=self.QUEUE_OPACITY
+        ).move_to(self.POSITION)
+
+        # Create and position the active section
+        self.active_section = Rectangle(
+            width=self.ACTIVE_WIDTH,
+            height=self.QUEUE_HEIGHT,
+            color=self.ACTIVE_COLOR or YELLOW,
+            fill_opacity=self.ACTIVE_OPACITY
+        ).next_to(self.blue_section, RIGHT, buff=0)
+
+        # Create left label only
+        self.queue_label = Text(
+            self.LEFT_LABEL,
+            font_size=24
+        ).next_to(self.blue_section, LEFT)
+
+        # Add elements to the containers group
+        self.containers.add(
+            self.blue_section,
+            self.active_section,
+            self.queue_label
+        )
+
+        scene.play(
+            Create(self.blue_section),
+            Create(self.active_section),
+            Write(self.queue_label)
+        )
+
+    def create_dot(self, position):
+        from manim import Dot
+
+        if self.dot_pool is not None:
+            return self.dot_pool.acquire(
+                point=position,
+                radius=self.DOT_RADIUS,
+                color=self.ITEM_COLOR
+            )
+        return Dot(
+            point=position,
+            radius=self.DOT_RADIUS,
+            color=self.ITEM_COLOR
+        )
+
+    def initialize_state(self, scene, initial_queue=100, initial_active=60):
+        for dot in self.fill(initial_queue, initial_active):
+            scene.add(dot)
+
+    def get_stream_animations(self, count, run_time=0.15, direct_to_active=False):
+        from manim import Create
+
+        animations = []
+        for new_dot, final_pos in self.stream(count, direct_to_active):
+            animations.append(Create(new_dot, run_time=run_time))
+            animations.append(new_dot.animate.move_to(
+                final_pos).set_run_time(run_time))
+
+        return animations
+
+    def get_compact_animations(self, run_time=0.2, blue_order=None):
+        """
+        Moves every queued and active dot to the slot matching its index.
+
+        Only the dots whose slot actually changes are animated, all of them
+        in a single batched animation.
+
+        Args:
+            run_time (float): Duration of the compaction
+            blue_order (array-like): Optional permutation of the blue queue,
+                see `QueueModel.compact`
+        """
+        from manim import UpdateFromAlphaFunc, VGroup
+
+        moving_dots, start, end = self.compact(blue_order)
+        if not moving_dots:
+            return []
+
+        shapes = None
+
+        def move_dots(group, alpha):
+            nonlocal shapes
+            if shapes is None:
+                # (n, k, 3) outline of every dot around its center, taken
+                # once when the animation begins
+                centers = np.array([dot.get_center() for dot in group])
+                shapes = (np.stack([dot.points for dot in group])
+                          - centers[:, None, :])
+            points = (shapes
+                      + interpolate_positions(start, end, alpha)[:, None, :])
+            for dot, dot_points in zip(group, points):
+                dot.points = dot_points
+
+        return [UpdateFromAlphaFunc(VGroup(*moving_dots), move_dots,
+                                    run_time=run_time)]
+
+    def get_confirm_animations(self, run_time_confirm=0.3, run_time_replace=0.2):
+        run_times = {"confirm": run_time_confirm, "replace": run_time_replace}
+        return [
+            dot.animate.move_to(position).set_run_time(run_times[step])
+            for dot, position, step in self.confirm()
+        ]
+
+
+def play_compaction(scene, buckets, run_time=0.2):
+    """
+    Compacts every bucket created with `compact=True` in one play call of
+    its own, after the confirm and stream moves have finished, so that no
+    dot is driven by two animations at once.
+    """
+    animations = [animation for bucket in buckets if bucket.COMPACT
+                  for animation in bucket.get_compact_animations(run_time)]
+    if animations:
+        scene.play(*animations)
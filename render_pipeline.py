@@ -0,0 +1,161 @@
+from queue import Empty, Queue
+
+import numpy as np
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.scene.scene_file_writer import SceneFileWriter
+
+
+class FramePool:
+    """
+    Bounded pool of reusable frame buffers.
+
+    The renderer copies each frame into a free buffer and hands it to the
+    encoder thread; the encoder gives the buffer back once it has been
+    encoded. When every buffer is in flight, `acquire` blocks until one is
+    released, which keeps memory bounded at `size` frames.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.free_buffers = Queue()
+        self.allocated = 0
+
+    def acquire(self, frame, failed=lambda: False):
+        # Buffers are allocated lazily from the first frames, then recycled
+        if self.free_buffers.empty() and self.allocated < self.size:
+            self.allocated += 1
+            buffer = np.empty_like(frame, order="C")
+        else:
+            while True:
+                if failed():
+                    # A failed encoder skips the frames still queued for it,
+                    # so their buffers never come back; hand out plain
+                    # copies from then on so the writer can raise its error
+                    return frame.copy()
+                try:
+                    buffer = self.free_buffers.get(timeout=0.1)
+                    break
+                except Empty:
+                    pass
+        np.copyto(buffer, frame)
+        return buffer
+
+    def release(self, buffer):
+        self.free_buffers.put(buffer)
+
+
+class PooledSegmentEncoder:
+    """Segment encoder that returns each frame to its pool once encoded."""
+
+    def __init__(self, encoder, pool):
+        self.encoder = encoder
+        self.pool = pool
+
+    def __getattr__(self, name):
+        return getattr(self.encoder, name)
+
+    def write_frame(self, pixels, *, repeat=1):
+        try:
+            self.encoder.write_frame(pixels, repeat=repeat)
+        finally:
+            self.pool.release(pixels)
+
+
+class PipelinedFileWriter(SceneFileWriter):
+    """
+    Scene file writer that feeds Manim's background segment encoders from a
+    `FramePool` instead of a freshly allocated array per frame.
+
+    Extra frame sinks (objects with `write_frame(pixels, repeat)` and
+    `close()`) receive every rendered frame as well, before it is pooled.
+    """
+
+    def __init__(self, settings, pool_size=None, frame_sinks=()):
+        super().__init__(settings)
+        # Enough buffers to keep the encoder queue full while rendering
+        self.frame_pool = FramePool(pool_size or settings.encoder_queue_size + 2)
+        self.frame_sinks = list(frame_sinks)
+
+    def _create_segment_encoder(self, target):
+        return PooledSegmentEncoder(
+            super()._create_segment_encoder(target), self.frame_pool)
+
+    def encode_failed(self):
+        """Whether the current or any sealed, still encoding job failed."""
+        jobs = [self._current_encode_job, *self._inflight_encode_jobs]
+        return any(job is not None and job.failed for job in jobs)
+
+    def write_frame(self, pixels, *, repeat=1):
+        job = self._current_encode_job
+        if self.output_spec.is_video and job is not None and not job.failed:
+            for sink in self.frame_sinks:
+                sink.write_frame(pixels, repeat)
+            pixels = self.frame_pool.acquire(pixels, self.encode_failed)
+        super().write_frame(pixels, repeat=repeat)
+
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            for sink in self.frame_sinks:
+                sink.close()
+
+
+class PipelinedRenderer(CairoRenderer):
+    """
+    Cairo renderer whose frames go straight from the camera's pixel array
+    into a `PipelinedFileWriter` buffer, so rasterizing the next frame
+    overlaps with encoding the previous ones without per-frame allocations.
+    """
+
+    def __init__(self, pool_size=None, frame_sinks=(), **kwargs):
+        kwargs.setdefault("file_writer_class", PipelinedFileWriter)
+        super().__init__(**kwargs)
+        self.pool_size = pool_size
+        self.frame_sinks = frame_sinks
+
+    def init_scene(self, scene, session_spec, file_writer_settings):
+        self.file_writer = self._file_writer_class(
+            file_writer_settings,
+            pool_size=self.pool_size,
+            frame_sinks=self.frame_sinks,
+        )
+
+    def render(self, scene, time, moving_mobjects=None):
+        self.update_frame(scene, moving_mobjects)
+        self.add_frame(self.camera.pixel_array)
+
+    def freeze_current_frame(self, duration):
+        dt = 1 / self.camera.frame_rate
+        self.add_frame(self.camera.pixel_array, num_frames=int(duration / dt))
+
+
+def render_pipelined(scene_class, pool_size=None, **scene_kwargs):
+    """
+    Renders a scene with rasterization and encoding overlapped.
+
+    Args:
+        scene_class (type): Scene class to render
+        pool_size (int): Number of reusable frame buffers (defaults to the
+            encoder queue size plus two)
+        **scene_kwargs: Extra keyword arguments for the scene constructor
+    """
+    scene = scene_class(renderer=PipelinedRenderer(pool_size=pool_size),
+                        **scene_kwargs)
+    scene.render()
+    return scene
+
+
+if __name__ == "__main__":
+    import argparse
+    import importlib
+
+    parser = argparse.ArgumentParser(
+        description="Render a scene with pooled frame buffers.")
+    parser.add_argument("module", help="e.g. animation_fair_queue")
+    parser.add_argument("scene", help="e.g. NanoFairQueueAnimation")
+    parser.add_argument("--pool-size", type=int, default=None)
+    args = parser.parse_args()
+
+    render_pipelined(getattr(importlib.import_module(args.module), args.scene),
+                     pool_size=args.pool_size)
@@ -0,0 +1,208 @@
+"""
+Randomized invariant tests for the Manim-free queue models.
+
+    python -m pytest test_queue_models.py
+"""
+import random
+
+import numpy as np
+import pytest
+
+from fair_queue import SPAMMER, FairQueue, FairQueueEvent
+from queue_system import QueueModel
+
+SEEDS = range(100)
+
+
+def random_queue_operations(model, rng, steps):
+    """
+    Applies `steps` random operations to a QueueModel.
+
+    Yields:
+        list: Dots created by each operation (empty for other operations)
+    """
+    for _ in range(steps):
+        operation = rng.choice(["stream", "stream", "confirm", "compact"])
+        if operation == "stream":
+            moves = model.stream(rng.randint(0, 5),
+                                 direct_to_active=rng.random() < 0.3)
+            yield [dot for dot, _ in moves]
+        elif operation == "confirm":
+            model.confirm()
+            yield []
+        else:
+            blue_order = None
+            if model.blue_dots and rng.random() < 0.5:
+                blue_order = rng.sample(range(len(model.blue_dots)),
+                                        len(model.blue_dots))
+            model.compact(blue_order)
+            yield []
+
+
+def random_queue_model(seed):
+    rng = random.Random(seed)
+    np.random.seed(seed)
+    model = QueueModel()
+    created = model.fill(rng.randint(0, 40), rng.randint(0, 20))
+    return model, rng, created
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_queue_conserves_dots(seed):
+    """Every streamed dot is exactly once in the blue queue, the active
+    section or the confirmed list."""
+    model, rng, created = random_queue_model(seed)
+
+    for new_dots in random_queue_operations(model, rng, 200):
+        created.extend(new_dots)
+
+        sections = model.blue_dots + model.active_dots + model.confirmed_dots
+        ids = [id(dot) for dot in sections]
+        assert len(ids) == len(set(ids)), "dot in two places"
+        assert set(ids) == {id(dot) for dot in created}
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_compact_puts_dots_on_their_slots(seed):
+    model, rng, _ = random_queue_model(seed)
+    for _ in random_queue_operations(model, rng, 200):
+        pass
+
+    model.compact()
+    for index, dot in enumerate(model.blue_dots):
+        assert np.allclose(dot.slot_position,
+                           model.get_blue_grid_position(index))
+    for index, dot in enumerate(model.active_dots):
+        assert np.allclose(dot.slot_position,
+                           model.get_active_grid_position(index))
+
+    slots = np.array([dot.slot_position
+                      for dot in model.blue_dots + model.active_dots])
+    if len(slots):
+        assert len(np.unique(slots.round(6), axis=0)) == len(slots), \
+            "two dots share a slot"
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_compact_closes_the_gap_left_by_confirmations(seed):
+    """Confirmations leave the queue head behind; one compaction brings it
+    back next to the active section and a second one moves nothing."""
+    model, rng, _ = random_queue_model(seed)
+    model.fill(rng.randint(10, 60), rng.randint(1, 20))
+    for _ in range(rng.randint(1, 10)):
+        model.confirm()
+
+    model.compact()
+    assert model.blue_head == 0
+    for index, dot in enumerate(model.blue_dots):
+        assert np.allclose(dot.slot_position,
+                           model.get_blue_grid_position(index))
+    assert len(model.compact()[0]) == 0
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_confirm_moves_only_the_replacement(seed):
+    """Within the grid capacity, a confirmation moves the confirmed dot and
+    the dot filling its slot, and leaves every other dot in place."""
+    model, rng, _ = random_queue_model(seed)
+    model.stream(rng.randint(0, 60), direct_to_active=rng.random() < 0.5)
+
+    for _ in range(50):
+        before = {id(dot): dot.slot_position.copy()
+                  for dot in model.blue_dots + model.active_dots}
+        moved = {id(dot) for dot, _, _ in model.confirm()}
+        assert len(moved) <= 2
+
+        for dot in model.blue_dots + model.active_dots:
+            if id(dot) not in moved:
+                assert np.allclose(dot.slot_position, before[id(dot)])
+
+
+def random_fair_queue(seed):
+    rng = random.Random(seed)
+    peer_count = rng.randint(1, 6)
+    rounds = rng.randint(1, 10)
+    fair_queue = FairQueue(
+        peer_count=peer_count,
+        spammer_size=rng.randint(0, 10),
+        new_block_probabilities=[rng.random() for _ in range(peer_count)],
+        spammer_rounds=rng.randint(0, rounds),
+        rng=rng
+    )
+    return fair_queue, rounds
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_fair_queue_round_robin(seed):
+    """
+    Each round highlights peers 0..n-1 in order and serves each one exactly
+    when it has a block at its turn; the spammer turn only comes in rounds
+    before `spammer_rounds`, after the peers.
+    """
+    fair_queue, rounds = random_fair_queue(seed)
+    peer_count = fair_queue.peer_count
+
+    # Mirror of the queues, rebuilt from the events only
+    queues = {SPAMMER: list(fair_queue.spammer)}
+    queues.update({i: list(peer) for i, peer in enumerate(fair_queue.peers)})
+    served = {i: 0 for i in range(peer_count)}
+    rounds_with_block = {i: 0 for i in range(peer_count)}
+
+    events = list(fair_queue.run(rounds))
+    position = 0
+
+    def next_event():
+        nonlocal position
+        assert position < len(events), "events end mid-round"
+        position += 1
+        return events[position - 1]
+
+    for round in range(rounds):
+        for i in range(peer_count):
+            assert next_event() == FairQueueEvent("highlight", i)
+            event = next_event()
+            if queues[i]:
+                rounds_with_block[i] += 1
+                assert event == FairQueueEvent("process", i, queues[i].pop(0))
+                served[i] += 1
+            else:
+                assert event == FairQueueEvent("skip", i)
+
+        if round >= fair_queue.spammer_rounds:
+            continue
+
+        assert next_event() == FairQueueEvent("highlight", SPAMMER)
+        event = next_event()
+        last_peer = -1
+        while event.kind == "new_block" and event.queue != SPAMMER:
+            assert last_peer < event.queue < peer_count
+            assert event.slot == len(queues[event.queue])
+            queues[event.queue].append(event.block)
+            last_peer = event.queue
+            event = next_event()
+
+        if queues[SPAMMER]:
+            assert event == FairQueueEvent(
+                "process", SPAMMER, queues[SPAMMER].pop(0))
+            event = next_event()
+            assert event.kind == "new_block" and event.queue == SPAMMER
+            queues[SPAMMER].append(event.block)
+            event = next_event()
+        assert event == FairQueueEvent("unhighlight")
+
+    assert position == len(events), "events after the last round"
+    assert served == rounds_with_block
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_fair_queue_conserves_blocks(seed):
+    fair_queue, rounds = random_fair_queue(seed)
+    initial = len(fair_queue.spammer) + sum(map(len, fair_queue.peers))
+
+    added = sum(event.kind == "new_block" for event in fair_queue.run(rounds))
+
+    processed = [block for _, block in fair_queue.processed]
+    remaining = list(fair_queue.spammer) + [block for peer in fair_queue.peers
+                                            for block in peer]
+    assert len(set(processed + remaining)) == initial + added
+    assert len(processed) + len(remaining) == initial + added
@@ -0,0 +1,63 @@
+import pytest
+
+from timeline import Timeline
+
+
+def cascade(count, duration=0.5, overlap=0.0):
+    timeline = Timeline()
+    timeline.add("title", None, 0.8)
+    for i in range(count):
+        timeline.add(f"feature_{i}", None, duration,
+                     offset=-overlap if i > 0 else 0.0)
+    timeline.hold("final_hold", 1.0)
+    return timeline
+
+
+def segment_names(timeline):
+    return [[event.name for event in segment.events]
+            for segment in timeline.compile()]
+
+
+def test_back_to_back_events_play_separately():
+    assert segment_names(cascade(3)) == [
+        ["title"], ["feature_0"], ["feature_1"], ["feature_2"], ["final_hold"]]
+
+
+def test_overlapping_events_merge_into_one_segment():
+    timeline = cascade(3, overlap=0.25)
+
+    assert segment_names(timeline) == [
+        ["title"], ["feature_0", "feature_1", "feature_2"], ["final_hold"]]
+    features = timeline.compile()[1]
+    assert features.start == pytest.approx(0.8)
+    assert features.end == pytest.approx(0.8 + 3 * 0.5 - 2 * 0.25)
+    assert timeline.duration == pytest.approx(features.end + 1.0)
+
+
+def test_with_event_and_at_anchor_starts():
+    timeline = Timeline()
+    timeline.add("logo", None, 1.0)
+    timeline.add("flash", None, 0.5, with_event="logo", offset=0.25)
+    timeline.add("title", None, 1.0, after="logo")
+    timeline.add("late", None, 0.5, at=5.0)
+
+    assert timeline.schedule() == [
+        ("logo", 0.0, 1.0), ("flash", 0.25, 0.75), ("title", 1.0, 2.0),
+        ("late", 5.0, 5.5)]
+    assert segment_names(timeline) == [
+        ["logo", "flash"], ["title"], ["late"]]
+
+
+def test_fit_scales_to_total_duration():
+    timeline = cascade(3, overlap=0.25)
+    timeline.fit(10.0)
+
+    assert timeline.duration == pytest.approx(10.0)
+    assert len(timeline.compile()) == 3
+
+
+def test_duplicate_names_are_rejected():
+    timeline = Timeline()
+    timeline.add("logo", None, 1.0)
+    with pytest.raises(ValueError):
+        timeline.add("logo", None, 1.0)
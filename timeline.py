@@ -0,0 +1,151 @@
+# Events closer than this (in seconds) are considered back to back
+EPSILON = 1e-6
+
+
+class TimelineEvent:
+    def __init__(self, name, build, duration, start):
+        self.name = name
+        # Callable returning one animation or a list of animations, called
+        # right before the play call of its segment so it sees the state left
+        # by earlier segments. None for a hold (nothing moves).
+        self.build = build
+        self.duration = duration
+        self.start = start
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+
+class TimelineSegment:
+    """Events that overlap in time and are rendered by a single play call."""
+
+    def __init__(self, event):
+        self.start = event.start
+        self.end = event.end
+        self.events = [event]
+
+    def add(self, event):
+        self.events.append(event)
+        self.end = max(self.end, event.end)
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+class Timeline:
+    """
+    Declarative description of a scene as named events with durations.
+
+    Start times are resolved when the event is added, relative to other
+    events (`after`, `with_event`) or absolute (`at`). `compile` merges
+    overlapping events into as few play calls as possible, and `play`
+    renders them, filling gaps with waits.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.events_by_name = {}
+
+    def add(self, name, build, duration, after=None, with_event=None,
+            offset=0.0, at=None):
+        """
+        Adds an event to the timeline.
+
+        Args:
+            name (str): Unique event name, used to anchor later events
+            build (callable): Returns the animation(s) of the event, or None
+                for a hold
+            duration (float): Duration of the event in seconds
+            after (str): Start when this event ends (defaults to the
+                previously added event)
+            with_event (str): Start when this event starts
+            offset (float): Shift relative to the anchor; a negative offset
+                with `after` makes the events overlap
+            at (float): Absolute start time, overrides the anchors
+        """
+        if name in self.events_by_name:
+            raise ValueError(f"Duplicate timeline event: {name}")
+
+        if at is not None:
+            start = at
+        elif with_event is not None:
+            start = self.events_by_name[with_event].start + offset
+        else:
+            if after is not None:
+                anchor = self.events_by_name[after]
+            else:
+                anchor = self.events[-1] if self.events else None
+            start = (anchor.end if anchor else 0.0) + offset
+
+        event = TimelineEvent(name, build, duration, max(start, 0.0))
+        self.events.append(event)
+        self.events_by_name[name] = event
+        return event
+
+    def hold(self, name, duration, **kwargs):
+        return self.add(name, None, duration, **kwargs)
+
+    @property
+    def duration(self):
+        return max((event.end for event in self.events), default=0.0)
+
+    def fit(self, total_duration):
+        """Scales all start times and durations to a total length, e.g. a
+        voiceover track."""
+        factor = total_duration / self.duration
+        for event in self.events:
+            event.start *= factor
+            event.duration *= factor
+
+    def schedule(self):
+        """Returns (name, start, end) of every event in start order."""
+        return [(event.name, event.start, event.end)
+                for event in sorted(self.events, key=lambda e: e.start)]
+
+    def compile(self):
+        """Groups overlapping events into play segments."""
+        segments = []
+        for event in sorted(self.events, key=lambda e: e.start):
+            if segments and event.start < segments[-1].end - EPSILON:
+                segments[-1].add(event)
+            else:
+                segments.append(TimelineSegment(event))
+        return segments
+
+    def play(self, scene, after_segment=None):
+        """
+        Renders the compiled timeline into `scene`.
+
+        Args:
+            scene (Scene): Scene to play the segments in
+            after_segment (callable): Called with each segment once it has
+                been played, e.g. for per-step bookkeeping
+        """
+        from manim import AnimationGroup, Succession, Wait
+
+        clock = 0.0
+        for segment in self.compile():
+            if segment.start > clock + EPSILON:
+                scene.wait(segment.start - clock)
+
+            animations = []
+            for event in segment.events:
+                if event.build is None:
+                    animation = Wait(run_time=event.duration)
+                else:
+                    built = event.build()
+                    if not isinstance(built, (list, tuple)):
+                        built = [built]
+                    animation = AnimationGroup(*built, run_time=event.duration)
+
+                delay = event.start - segment.start
+                if delay > EPSILON:
+                    animation = Succession(Wait(run_time=delay), animation)
+                animations.append(animation)
+
+            scene.play(*animations)
+            clock = segment.end
+            if after_segment is not None:
+                after_segment(segment)